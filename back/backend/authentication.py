@@ -0,0 +1,160 @@
+"""
+Token authentication with a cache in front of the Token + User query.
+
+``CachedTokenAuthentication`` keeps a bounded LRU of token key -> user
+snapshot in each process, with a short TTL. When ``TOKEN_CACHE_ALIAS``
+names a cache shared between workers, snapshots are also stored there, so
+a token validated by one worker is a cache hit for the others.
+
+Entries are dropped when the user is saved or deleted, when the token is
+deleted, and on logout. The shared cache sees those invalidations at once.
+Other workers' in-process copies expire within ``TOKEN_CACHE_TTL`` seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# the only user columns views read from request.user; anything else is
+# loaded lazily like any deferred field
+SNAPSHOT_FIELDS = ("id", "username", "email", "first_name", "last_name", "is_active", "is_staff", "is_superuser")
+
+
+def _shared_key(key):
+    return f"auth-token:{key}"
+
+
+class TokenCache:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        return None
+
+    def set(self, key, snapshot):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def discard(self, keys):
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def discard_user(self, user_id):
+        with self._lock:
+            keys = [key for key, (_, snapshot) in self._entries.items() if snapshot["id"] == user_id]
+        self.discard(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "sharedHits": self.shared_hits,
+                "misses": self.misses,
+                "hitRate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+token_cache = TokenCache(
+    getattr(settings, "TOKEN_CACHE_SIZE", 10000),
+    getattr(settings, "TOKEN_CACHE_TTL", 30),
+)
+
+
+def shared_cache():
+    alias = getattr(settings, "TOKEN_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def snapshot_user(user):
+    return {name: getattr(user, name) for name in SNAPSHOT_FIELDS}
+
+
+def user_from_snapshot(snapshot):
+    # from_db takes values in the model's column order
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in snapshot]
+    return User.from_db(DEFAULT_DB_ALIAS, names, [snapshot[name] for name in names])
+
+
+def invalidate_tokens(keys):
+    keys = [key for key in keys if key]
+    token_cache.discard(keys)
+    shared = shared_cache()
+    if shared is not None and keys:
+        shared.delete_many([_shared_key(key) for key in keys])
+
+
+def invalidate_user(user_id):
+    token_cache.discard_user(user_id)
+    if shared_cache() is not None:
+        invalidate_tokens(Token.objects.filter(user_id=user_id).values_list("key", flat=True))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        snapshot = token_cache.get(key)
+        if snapshot is None:
+            snapshot = self.shared_snapshot(key)
+        if snapshot is None:
+            token_cache.record("misses")
+            user, token = super().authenticate_credentials(key)
+            snapshot = snapshot_user(user)
+            token_cache.set(key, snapshot)
+            shared = shared_cache()
+            if shared is not None:
+                shared.set(_shared_key(key), snapshot, getattr(settings, "TOKEN_CACHE_SHARED_TTL", 300))
+            return user, token
+
+        if not snapshot["is_active"]:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        user = user_from_snapshot(snapshot)
+        token = Token.from_db(DEFAULT_DB_ALIAS, ["key", "user_id"], [key, user.pk])
+        token.user = user
+        return user, token
+
+    def shared_snapshot(self, key):
+        shared = shared_cache()
+        if shared is None:
+            return None
+        snapshot = shared.get(_shared_key(key))
+        if snapshot is not None:
+            token_cache.record("shared_hits")
+            token_cache.set(key, snapshot)
+        return snapshot
@@ -0,0 +1,253 @@
+"""
+Materialized product JSON for the catalog read endpoints.
+
+Each product is serialized once into UTF-8 JSON bytes and kept in the
+default cache under a key versioned by ``Product.updated_at``, so every
+worker process sees a write as soon as the row changes. The cached value
+maps the request base URL (scheme + host) to the encoded snapshot,
+because image URLs are absolute. Writes that do not touch the product row
+itself (images, category renames) bump ``updated_at`` in ``signals.py``.
+"""
+import hashlib
+import json
+import threading
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Prefetch
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Product, ProductImage
+
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+def snapshot_key(product):
+    return f"product-json:{product.pk}:{product.updated_at.timestamp()}"
+
+
+def _base_url(request):
+    return request.build_absolute_uri("/")
+
+
+def _image_url(request, image):
+    return request.build_absolute_uri(image.url) if image else None
+
+
+# payload key -> (model columns it reads, value getter)
+PRODUCT_FIELDS = {
+    "id": (("id",), lambda product, request: product.id),
+    "name": (("name",), lambda product, request: product.name),
+    "description": (("description",), lambda product, request: product.description),
+    "price": (("price",), lambda product, request: str(product.price)),
+    "originalPrice": (
+        ("original_price",),
+        lambda product, request: str(product.original_price) if product.original_price else None,
+    ),
+    "discount": (("discount",), lambda product, request: product.discount),
+    "image": (("image",), lambda product, request: _image_url(request, product.image)),
+    "images": ((), lambda product, request: [_image_url(request, img.image) for img in product.images.all()]),
+    "category": (
+        ("category__name",),
+        lambda product, request: product.category.name if product.category else None,
+    ),
+    "brand": (("brand",), lambda product, request: product.brand),
+    "rating": (("rating",), lambda product, request: product.rating),
+    "reviews": (("reviews",), lambda product, request: product.reviews),
+    "inStock": (("in_stock",), lambda product, request: product.in_stock),
+    "stockQuantity": (("stock_quantity",), lambda product, request: product.stock_quantity),
+    "features": (("features",), lambda product, request: product.features if product.features else []),
+    "tags": (("tags",), lambda product, request: product.tags if product.tags else []),
+    "isTodaysDeals": (("is_todays_deals",), lambda product, request: product.is_todays_deals),
+    "isBestSeller": (("is_best_seller",), lambda product, request: product.is_best_seller),
+    "isFeatured": (("is_featured",), lambda product, request: product.is_featured),
+    "isNewArrival": (("is_new_arrival",), lambda product, request: product.is_new_arrival),
+    "isTopRated": (("is_top_rated",), lambda product, request: product.is_top_rated),
+    "isTrending": (("is_trending",), lambda product, request: product.is_trending),
+    "isFlashSale": (("is_flash_sale",), lambda product, request: product.is_flash_sale),
+    "createdAt": (("created_at",), lambda product, request: product.created_at.isoformat()),
+    "updatedAt": (("updated_at",), lambda product, request: product.updated_at.isoformat()),
+}
+
+
+def product_data(product, request, fields=None):
+    """
+    Product payload, or only ``fields`` of it. Expects category
+    select_related and images prefetched when those keys are included.
+    """
+    return {
+        key: getter(product, request)
+        for key, (columns, getter) in PRODUCT_FIELDS.items()
+        if fields is None or key in fields
+    }
+
+
+def requested_fields(request):
+    """Parse ?fields=id,name,... into a list, None when absent. Raises ValueError on unknown keys."""
+    fields = [field.strip() for field in request.GET.get("fields", "").split(",") if field.strip()]
+    if not fields:
+        return None
+    unknown = [field for field in fields if field not in PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def sparse_queryset(queryset, fields, *extra_columns):
+    """Restrict ``queryset`` to the columns (and relations) that ``fields`` read."""
+    columns = {"id", *extra_columns}
+    for field in fields:
+        columns.update(PRODUCT_FIELDS[field][0])
+    if "category" in fields:
+        queryset = queryset.select_related("category")
+    if "images" in fields:
+        queryset = queryset.prefetch_related(
+            Prefetch("images", queryset=ProductImage.objects.only("id", "product_id", "image"))
+        )
+    return queryset.only(*columns)
+
+
+def encode(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+
+
+def get_snapshots(products, request):
+    """
+    Return {product_id: json bytes} for ``products``, which only need
+    ``id`` and ``updated_at`` loaded. Cache misses are fetched in one query
+    (plus one for images) and written back.
+    """
+    base = _base_url(request)
+    keys = {snapshot_key(product): product.pk for product in products}
+    cached = cache.get_many(keys.keys())
+
+    snapshots = {}
+    entries = {}
+    for key, pk in keys.items():
+        entry = cached.get(key) or {}
+        if base in entry:
+            snapshots[pk] = entry[base]
+        else:
+            entries[pk] = entry
+
+    if entries:
+        loaded = (
+            Product.objects.select_related("category")
+            .prefetch_related("images")
+            .in_bulk(list(entries))
+        )
+        to_cache = {}
+        for pk, product in loaded.items():
+            snapshots[pk] = encode(product_data(product, request))
+            to_cache[snapshot_key(product)] = {**entries[pk], base: snapshots[pk]}
+        cache.set_many(to_cache, SNAPSHOT_TIMEOUT)
+
+    return snapshots
+
+
+def get_snapshot(product, request):
+    return get_snapshots([product], request).get(product.pk)
+
+
+# In-process copy of the encoded category listing, per base URL. Entries
+# are tagged with the listing ETag, so another worker's write (which moves
+# the ETag) is picked up without cross-process invalidation.
+_category_listing = {}
+_category_listing_lock = threading.Lock()
+
+
+def category_listing(request, etag, render):
+    """Return the encoded category listing for ``etag``, calling ``render`` on a miss."""
+    base = _base_url(request)
+    with _category_listing_lock:
+        cached = _category_listing.get(base)
+    if cached and cached[0] == etag:
+        return cached[1]
+
+    body = render()
+    with _category_listing_lock:
+        _category_listing[base] = (etag, body)
+    return body
+
+
+def invalidate_category_listing():
+    with _category_listing_lock:
+        _category_listing.clear()
+
+
+def stream_products(queryset, request, ndjson=False, chunk_size=500):
+    """
+    Yield the full payload of every product in ``queryset`` as encoded JSON,
+    either one object per line (NDJSON) or as a single array. Rows are read
+    ``chunk_size`` at a time so memory stays flat whatever the catalog size.
+    """
+    products = (
+        queryset.select_related("category")
+        .prefetch_related("images")
+        .order_by("id")
+        .iterator(chunk_size=chunk_size)
+    )
+    if ndjson:
+        for product in products:
+            yield encode(product_data(product, request)) + b"\n"
+        return
+
+    yield b"["
+    separator = b""
+    for product in products:
+        yield separator + encode(product_data(product, request))
+        separator = b","
+    yield b"]"
+
+
+def json_array(parts):
+    return b"[" + b",".join(parts) + b"]"
+
+
+def json_response(content, status=200):
+    return HttpResponse(content, status=status, content_type="application/json")
+
+
+def validators(updated_at, *parts):
+    """
+    Return (etag, last_modified) for a response built from rows last changed
+    at ``updated_at``. ``parts`` must cover everything else the body depends
+    on (row count, query string, host, caller scope).
+    """
+    seed = ":".join(str(part) for part in (updated_at and updated_at.timestamp(), *parts))
+    etag = '"%s"' % hashlib.sha1(seed.encode()).hexdigest()
+    last_modified = int(updated_at.timestamp()) if updated_at else None
+    return etag, last_modified
+
+
+def collection_validators(queryset, request, *parts):
+    """
+    Validators for a listing, from a single MAX/COUNT aggregate. Only the
+    ETag is used: MAX(updated_at) does not move when a row is deleted, and
+    Last-Modified has one-second resolution, so If-Modified-Since alone
+    would keep serving a stale listing.
+    """
+    stats = queryset.order_by().aggregate(last=Max("updated_at"), count=Count("id"))
+    etag, _ = validators(stats["last"], stats["count"], _base_url(request), request.get_full_path(), *parts)
+    return etag, None
+
+
+def product_validators(product, request):
+    return validators(product.updated_at, product.pk, _base_url(request), request.get_full_path())
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 response when the client's copy is current, otherwise None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        with_validators(response, etag, last_modified)
+    return response
+
+
+def with_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    return response
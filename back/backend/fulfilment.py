@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import rollups
+from .models import Order, OrderStatusEvent
+
+
+def allowed_from(to_status):
+    """Statuses an order may be in to move to ``to_status``."""
+    return sorted(
+        from_status for from_status, targets in Order.ALLOWED_TRANSITIONS.items()
+        if to_status in targets
+    )
+
+
+def transition_orders(order_ids, to_status, changed_by=None, tracking_numbers=None, force=False):
+    """
+    Move the orders in ``order_ids`` to ``to_status`` with one conditional
+    UPDATE, skipping any order whose current status does not allow it.
+    ``force`` lifts ALLOWED_TRANSITIONS so an admin can undo a mistake.
+    ``tracking_numbers`` ({order_id: number}) is written in the same
+    statement. Returns the list of OrderStatusEvent rows written.
+    """
+    tracking_numbers = tracking_numbers or {}
+    if force:
+        allowed = [value for value, _ in Order.STATUS_CHOICES if value != to_status]
+    else:
+        allowed = allowed_from(to_status)
+    now = timezone.now()
+
+    with transaction.atomic():
+        movable = Order.objects.filter(id__in=set(order_ids), status__in=allowed)
+        # lock the rows so the recorded from_status is the one the UPDATE replaces
+        current = dict(movable.select_for_update().values_list("id", "status"))
+        if not current:
+            return []
+
+        update = {"status": to_status, "updated_at": now}
+        tracked = {pk: number for pk, number in tracking_numbers.items() if pk in current}
+        if tracked:
+            update["tracking_number"] = Case(
+                *[When(id=pk, then=Value(number)) for pk, number in tracked.items()],
+                default=F("tracking_number"),
+            )
+        Order.objects.filter(id__in=current, status__in=allowed).update(**update)
+        rollups.record_transitions(current, to_status)
+
+        return OrderStatusEvent.objects.bulk_create([
+            OrderStatusEvent(
+                order_id=pk,
+                from_status=from_status,
+                to_status=to_status,
+                tracking_number=tracked.get(pk, ""),
+                changed_by=changed_by,
+            )
+            for pk, from_status in current.items()
+        ])
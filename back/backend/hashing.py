@@ -0,0 +1,99 @@
+"""
+Password hashing off the request thread.
+
+``PooledPBKDF2PasswordHasher`` is the first entry in PASSWORD_HASHERS, so
+every PBKDF2 hash Django computes (authenticate(), make_password(),
+set_password()) runs in one shared pool of ``PASSWORD_HASHING_WORKERS``
+threads, with at most ``PASSWORD_HASHING_QUEUE`` more jobs waiting. Past
+that, the hasher raises ``HashingBusy`` and the view answers 503 instead of
+piling up more CPU work. hashlib releases the GIL while it hashes, so the
+pool caps how many cores credential traffic can take while the other WSGI
+threads keep serving the catalog. Authentication backends, signals and
+database access are untouched and stay on the caller's thread.
+
+The caller still blocks until its hash is done, so this only helps under
+WSGI. Under ASGI, every view here is a sync DRF view sharing one
+thread-sensitive executor thread, and a login waiting on the pool stalls
+them all.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+
+
+class HashingBusy(Exception):
+    pass
+
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+# set in pool threads and import processes, which hash in place
+_local = threading.local()
+
+
+def _hash_in_place():
+    _local.direct = True
+
+
+def _get_pool():
+    global _pool, _slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = getattr(settings, "PASSWORD_HASHING_WORKERS", None) or max(1, (os.cpu_count() or 2) // 2)
+                _slots = threading.BoundedSemaphore(workers + getattr(settings, "PASSWORD_HASHING_QUEUE", 32))
+                _pool = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="password-hashing", initializer=_hash_in_place,
+                )
+    return _pool, _slots
+
+
+def run(fn, *args):
+    """Run ``fn(*args)`` on the hashing pool and wait for it; raises HashingBusy when full."""
+    if getattr(_local, "direct", False):
+        return fn(*args)
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        future = pool.submit(fn, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future.result()
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with the key derivation run on the pool. It keeps
+    the "pbkdf2_sha256" algorithm name, so stored hashes are unchanged; it
+    replaces rather than joins PBKDF2PasswordHasher in PASSWORD_HASHERS.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        # verify() and harden_runtime() go through encode() too
+        return run(super().encode, password, salt, iterations)
+
+
+# Process-pool helpers for bulk imports. This module imports no models, so
+# spawned workers can load it before Django is set up.
+
+def init_process():
+    import django
+    django.setup()
+    _hash_in_place()
+
+
+def hash_many(passwords):
+    # imports bring their own workers; don't queue behind logins or get HashingBusy
+    direct = getattr(_local, "direct", False)
+    _local.direct = True
+    try:
+        return [make_password(password) for password in passwords]
+    finally:
+        _local.direct = direct
@@ -0,0 +1,50 @@
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Product
+
+
+class InsufficientStock(Exception):
+    def __init__(self, shortages):
+        super().__init__("Insufficient stock")
+        self.shortages = shortages
+
+
+def reserve_stock(quantities):
+    """
+    Take ``quantities`` ({product_id: units}) out of stock. Must run inside
+    transaction.atomic(); raises InsufficientStock describing every line that
+    could not be covered, and the caller's transaction rolls the rest back.
+
+    Each line is a single conditional UPDATE, so concurrent checkouts only
+    contend on the rows they touch and can never drive stock below zero.
+    """
+    now = timezone.now()
+    short = []
+    # a fixed order means two baskets sharing products lock them the same way round
+    for product_id in sorted(quantities):
+        units = quantities[product_id]
+        updated = Product.objects.filter(
+            id=product_id, in_stock=True, stock_quantity__gte=units,
+        ).update(
+            # before stock_quantity: MySQL applies SET assignments left to right,
+            # so later ones would see the decremented stock
+            in_stock=Case(When(stock_quantity__gt=units, then=Value(True)), default=Value(False)),
+            stock_quantity=F("stock_quantity") - units,
+            updated_at=now,
+        )
+        if not updated:
+            short.append(product_id)
+
+    if short:
+        available = dict(
+            Product.objects.filter(id__in=short).values_list("id", "stock_quantity")
+        )
+        raise InsufficientStock([
+            {
+                "product_id": product_id,
+                "requested": quantities[product_id],
+                "available": available.get(product_id, 0),
+            }
+            for product_id in short
+        ])
@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Case, IntegerField, Value, When
+
+from backend.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Link orders placed before Order.customer existed to their user by "
+        "matching customer_email, one primary-key range at a time. Migration "
+        "0029 runs this once; rerun it for orders written by older code."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        linked = unmatched = 0
+        for last_id, linked, unmatched in link_customers(Order, User, options["batch_size"]):
+            self.stdout.write(f"Up to order {last_id}: {linked} linked")
+
+        self.stdout.write(self.style.SUCCESS(f"Linked {linked} orders, {unmatched} without a matching user"))
+
+
+def link_customers(Order, User, batch_size=1000):
+    """
+    Set Order.customer from customer_email, one primary-key range at a time,
+    yielding (last order id, linked so far, unmatched so far) per chunk.
+    Takes the model classes so migration 0029 can run it on historical models.
+    """
+    last_id = 0
+    linked = 0
+    unmatched = 0
+    while True:
+        chunk = list(
+            Order.objects.filter(customer__isnull=True, id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "customer_email")[:batch_size]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+
+        emails = {email for _, email in chunk if email}
+        # the oldest account wins if several share an email
+        users = {}
+        for user_id, email in User.objects.filter(email__in=emails).order_by("-id").values_list("id", "email"):
+            users[email] = user_id
+
+        matched = [order_id for order_id, email in chunk if email in users]
+        unmatched += len(chunk) - len(matched)
+        if matched:
+            linked += Order.objects.filter(id__in=matched, customer__isnull=True).update(
+                customer_id=Case(
+                    *[When(customer_email=email, then=Value(user_id)) for email, user_id in users.items()],
+                    output_field=IntegerField(),
+                )
+            )
+        yield last_id, linked, unmatched
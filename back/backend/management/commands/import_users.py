@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.user_import import FORMATS, UserImporter
+
+
+class Command(BaseCommand):
+    help = "Import customers from a CSV or JSON Lines file (columns: email, password, name, last_name, role)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--input-format", choices=FORMATS, help="Default: from the file extension")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, help="Hashing processes (default: CPU count)")
+        parser.add_argument("--report", help="Write the full JSON report here")
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        fmt = options["input_format"] or ("jsonl" if path.suffix in (".jsonl", ".ndjson") else "csv")
+        if not path.exists():
+            raise CommandError(f"{path} does not exist")
+
+        importer = UserImporter(chunk_size=options["chunk_size"], workers=options["workers"])
+        with path.open("rb") as fh:
+            report = importer.run(fh, fmt)
+
+        for error in report["errors"][:20]:
+            self.stderr.write(f"line {error['line']}: {error['email']} {error['error']}")
+        if options["report"]:
+            with open(options["report"], "w") as fh:
+                json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} users, {report['errorCount']} rows rejected "
+            f"({report['duplicates']} already existed)"
+        ))
@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from backend import rollups
+from backend.models import Order
+
+
+def parse_day(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}; use YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily sales rollup tables from the order history, one "
+        "window of days per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=parse_day, help="First order date to rebuild (default: oldest order)")
+        parser.add_argument("--until", type=parse_day, help="Last order date to rebuild (default: newest order)")
+        parser.add_argument("--batch-days", type=int, default=31)
+
+    def handle(self, *args, **options):
+        bounds = Order.objects.aggregate(first=Min("date"), last=Max("date"))
+        start = options["since"] or bounds["first"]
+        end = options["until"] or bounds["last"]
+        if start is None or end is None:
+            self.stdout.write("No orders to roll up")
+            return
+
+        rows = 0
+        while start <= end:
+            window_end = min(end, start + timedelta(days=options["batch_days"] - 1))
+            rows += rollups.rebuild_days(start, window_end)
+            self.stdout.write(f"{start} .. {window_end}: {rows} rows so far")
+            start = window_end + timedelta(days=1)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt sales rollups, {rows} rows"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from backend import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product full-text search index (needed after bulk imports)."
+
+    def handle(self, *args, **options):
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
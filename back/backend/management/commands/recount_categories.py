@@ -0,0 +1,40 @@
+from django.db.models import Count
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend import catalog
+from backend.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = "Recompute Category.product_count from the products table in one GROUP BY."
+
+    def handle(self, *args, **options):
+        corrected = recount(Category, Product)
+        catalog.invalidate_category_listing()
+        self.stdout.write(self.style.SUCCESS(f"Recounted categories, {corrected} corrected"))
+
+
+def recount(Category, Product):
+    """
+    Set every category's product_count from one GROUP BY and return how many
+    changed. Takes the model classes so migration 0022 can run it on
+    historical models.
+    """
+    counts = dict(
+        Product.objects.order_by()
+        .values_list("category_id")
+        .annotate(count=Count("id"))
+    )
+
+    now = timezone.now()
+    changed = []
+    for category in Category.objects.only("id", "product_count"):
+        count = counts.get(category.id, 0)
+        if category.product_count != count:
+            category.product_count = count
+            category.updated_at = now
+            changed.append(category)
+
+    Category.objects.bulk_update(changed, ["product_count", "updated_at"], batch_size=500)
+    return len(changed)
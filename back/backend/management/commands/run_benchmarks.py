@@ -0,0 +1,139 @@
+import json
+import platform
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from backend import order_numbers
+from backend.models import Cart, Order, Product, Store
+
+from .seed_benchmark_data import BENCH_PREFIX
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the hot API endpoints through the Django test client against data "
+        "from seed_benchmark_data, recording p50/p99 latency and SQL query counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--output", default="benchmark-report.json")
+        parser.add_argument("--only", nargs="*", help="Run only these endpoint names")
+
+    def handle(self, *args, **options):
+        admin = (
+            User.objects.filter(username__startswith=BENCH_PREFIX, is_superuser=True, store__isnull=False)
+            .order_by("id").first()
+        )
+        customer = (
+            User.objects.filter(username__startswith=BENCH_PREFIX, is_superuser=False, cart_items__isnull=False)
+            .order_by("id").first()
+        )
+        if admin is None or customer is None:
+            raise CommandError("No benchmark data found; run seed_benchmark_data first.")
+
+        admin_auth = {"HTTP_AUTHORIZATION": f"Token {Token.objects.get_or_create(user=admin)[0].key}"}
+        customer_auth = {"HTTP_AUTHORIZATION": f"Token {Token.objects.get_or_create(user=customer)[0].key}"}
+        product = Product.objects.filter(in_stock=True, stock_quantity__gt=10).only("id", "price").first()
+        order_payload = json.dumps({
+            "items": [{"product_id": product.id, "quantity": 1}],
+            "phone": "0700000000",
+            "address": "Bench Street",
+            "subtotal": str(product.price),
+            "total": str(product.price),
+        })
+
+        endpoints = [
+            ("get_products", "get", "/api/getProducts/?limit=24", {}, {}),
+            ("get_products_admin", "get", "/api/getProducts/?limit=24", {}, admin_auth),
+            ("get_product", "get", f"/api/getProduct/{product.id}/", {}, {}),
+            ("get_cart", "get", "/api/get_cart/", {}, customer_auth),
+            ("getOrders", "get", "/api/getOrders/", {}, customer_auth),
+            ("getOrders_admin", "get", "/api/getOrders/", {}, admin_auth),
+            ("getUsers", "get", "/api/getUsers/", {}, admin_auth),
+            (
+                "create_order", "post", "/api/create_order/",
+                {"data": order_payload, "content_type": "application/json"}, customer_auth,
+            ),
+        ]
+        if options["only"]:
+            endpoints = [endpoint for endpoint in endpoints if endpoint[0] in options["only"]]
+
+        client = Client()
+        results = {}
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for name, method, url, kwargs, auth in endpoints:
+                self.stdout.write(f"{name} ...")
+                results[name] = self.measure(client, method, url, kwargs, auth, options)
+                self.stdout.write(
+                    f"  p50 {results[name]['p50_ms']:.2f} ms  p99 {results[name]['p99_ms']:.2f} ms  "
+                    f"queries {results[name]['queries']}"
+                )
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "iterations": options["iterations"],
+            "dataset": {
+                "stores": Store.objects.count(),
+                "products": Product.objects.count(),
+                "users": User.objects.count(),
+                "cart_items": Cart.objects.count(),
+                "orders": Order.objects.count(),
+            },
+            "endpoints": results,
+        }
+        with open(options["output"], "w") as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+    def measure(self, client, method, url, kwargs, auth, options):
+        call = getattr(client, method)
+        timings = []
+        queries = []
+        status_codes = set()
+
+        # take (or renew) the order-number lease in a committed write; one
+        # taken inside the rolled-back iterations below is never confirmed,
+        # so create_order would pay for leasing again on every iteration
+        order_numbers.get_generator()
+
+        for i in range(options["warmup"] + options["iterations"]):
+            # writes are rolled back so every iteration sees the same dataset
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = call(url, **kwargs, **auth)
+                    elapsed = time.perf_counter() - start
+                transaction.set_rollback(True)
+
+            if i < options["warmup"]:
+                continue
+            timings.append(elapsed * 1000)
+            queries.append(len(captured))
+            status_codes.add(response.status_code)
+
+        return {
+            "url": url,
+            "status": sorted(status_codes),
+            "p50_ms": round(statistics.median(timings), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "queries": max(queries),
+        }
@@ -0,0 +1,195 @@
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from backend.models import Cart, Category, Order, OrderItem, Product, ProductImage, Store
+
+BENCH_PREFIX = "bench-"
+BENCH_PASSWORD = "bench-password"
+SAMPLE_IMAGES = ["products/01.webp", "products/OIP.webp", "products/download.webp"]
+WORDS = [
+    "phone", "laptop", "speaker", "headphones", "charger", "cable", "watch", "camera",
+    "tablet", "keyboard", "mouse", "monitor", "router", "printer", "console", "drone",
+]
+BRANDS = ["Samsung", "Itel", "JBL", "Tecno", "Oppo", "HP", "Lenovo", "Sony"]
+FLAGS = ["bestseller", "featured", "new", "top rated", "trending", "flashsale", "popular", "premium"]
+
+
+def bulk_create_with_ids(model, objs, key):
+    """bulk_create that also fills in primary keys on backends without RETURNING (MySQL)."""
+    created = model.objects.bulk_create(objs)
+    if all(obj.pk for obj in created):
+        return created
+    ids = dict(
+        model.objects.filter(**{f"{key}__in": [getattr(obj, key) for obj in created]})
+        .values_list(key, "id")
+    )
+    for obj in created:
+        obj.pk = ids[getattr(obj, key)]
+    return created
+
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset for run_benchmarks. Writes to the configured "
+        "database, so point DATABASES at a scratch database first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stores", type=int, default=5)
+        parser.add_argument("--categories", type=int, default=20)
+        parser.add_argument("--products", type=int, default=100000)
+        parser.add_argument("--images-per-product", type=int, default=2)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--cart-items", type=int, default=3, help="Cart rows per user")
+        parser.add_argument("--orders", type=int, default=5000)
+        parser.add_argument("--max-order-lines", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+
+        if User.objects.filter(username__startswith=BENCH_PREFIX).exists():
+            self.stderr.write("Benchmark data already present; use a fresh database.")
+            return
+
+        # hashing once keeps seeding fast; every bench user shares the password
+        password = make_password(BENCH_PASSWORD)
+
+        with transaction.atomic():
+            owners = bulk_create_with_ids(User, [
+                User(
+                    username=f"{BENCH_PREFIX}admin{i}@example.com",
+                    email=f"{BENCH_PREFIX}admin{i}@example.com",
+                    first_name=f"Admin{i}",
+                    password=password,
+                    is_superuser=True,
+                    is_staff=True,
+                )
+                for i in range(options["stores"])
+            ], "username")
+            stores = bulk_create_with_ids(Store, [
+                Store(name=f"{BENCH_PREFIX}store-{i}", owner=owner)
+                for i, owner in enumerate(owners)
+            ], "name")
+            categories = bulk_create_with_ids(Category, [
+                Category(name=f"{BENCH_PREFIX}category-{i}")
+                for i in range(options["categories"])
+            ], "name")
+        self.stdout.write(f"Created {len(stores)} stores, {len(categories)} categories")
+
+        product_ids = []
+        for chunk in batched(range(options["products"]), batch_size):
+            products = []
+            for i in chunk:
+                name_words = rng.sample(WORDS, 2)
+                tags = rng.sample(FLAGS, rng.randint(0, 2))
+                products.append(Product(
+                    store=rng.choice(stores),
+                    category=rng.choice(categories),
+                    name=f"{BENCH_PREFIX}{' '.join(name_words)} {i}",
+                    description=f"A {' '.join(name_words)} for benchmarking, item {i}.",
+                    price=Decimal(rng.randint(100, 200000)) / 100,
+                    brand=rng.choice(BRANDS),
+                    image=rng.choice(SAMPLE_IMAGES),
+                    stock_quantity=rng.randint(0, 500),
+                    features=["Synthetic"],
+                    tags=tags,
+                    is_best_seller="bestseller" in tags,
+                    is_featured="featured" in tags,
+                    is_new_arrival="new" in tags,
+                    is_top_rated="top rated" in tags,
+                    is_trending="trending" in tags,
+                    is_flash_sale="flashsale" in tags,
+                    is_popular="popular" in tags,
+                    is_premium="premium" in tags,
+                ))
+            with transaction.atomic():
+                created = bulk_create_with_ids(Product, products, "name")
+                ProductImage.objects.bulk_create([
+                    ProductImage(product=product, image=rng.choice(SAMPLE_IMAGES))
+                    for product in created
+                    for _ in range(options["images_per_product"])
+                ])
+            product_ids.extend(product.pk for product in created)
+        self.stdout.write(f"Created {len(product_ids)} products")
+
+        customers = []
+        for chunk in batched(range(options["users"]), batch_size):
+            with transaction.atomic():
+                customers.extend(bulk_create_with_ids(User, [
+                    User(
+                        username=f"{BENCH_PREFIX}user{i}@example.com",
+                        email=f"{BENCH_PREFIX}user{i}@example.com",
+                        first_name=f"User{i}",
+                        last_name="Bench",
+                        password=password,
+                    )
+                    for i in chunk
+                ], "username"))
+        for chunk in batched(customers, batch_size):
+            Cart.objects.bulk_create([
+                Cart(user=customer, product_id=product_id, quantity=rng.randint(1, 3))
+                for customer in chunk
+                for product_id in rng.sample(product_ids, min(options["cart_items"], len(product_ids)))
+            ])
+        self.stdout.write(f"Created {len(customers)} customers with carts")
+
+        products_by_id = Product.objects.only("id", "name", "price", "store", "image").in_bulk(product_ids)
+        for chunk in batched(range(options["orders"]), batch_size):
+            orders = []
+            lines = []
+            for i in chunk:
+                customer = rng.choice(customers)
+                picked = [
+                    products_by_id[pk]
+                    for pk in rng.sample(product_ids, rng.randint(1, options["max_order_lines"]))
+                ]
+                quantities = [rng.randint(1, 3) for _ in picked]
+                subtotal = sum(product.price * qty for product, qty in zip(picked, quantities))
+                orders.append(Order(
+                    order_number=f"BENCH-{i:08d}",
+                    customer_name=f"{customer.first_name} {customer.last_name}",
+                    customer=customer,
+                    customer_email=customer.email,
+                    customer_phone="0700000000",
+                    shipping_address="Bench Street",
+                    status=rng.choice(Order.STATUS_CHOICES)[0],
+                    subtotal=subtotal,
+                    total=subtotal,
+                ))
+                lines.append(list(zip(picked, quantities)))
+            with transaction.atomic():
+                orders = bulk_create_with_ids(Order, orders, "order_number")
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order,
+                        product_id=product.pk,
+                        product_name=product.name,
+                        quantity=qty,
+                        price=product.price,
+                        store_id=product.store_id,
+                        product_image=product.image.name or "",
+                    )
+                    for order, order_lines in zip(orders, lines)
+                    for product, qty in order_lines
+                ])
+        self.stdout.write(f"Created {options['orders']} orders")
+
+        # bulk_create skips the signals that maintain derived data
+        call_command("recount_categories", stdout=self.stdout)
+        call_command("rebuild_search_index", stdout=self.stdout)
+        call_command("rebuild_sales_rollups", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS("Benchmark dataset ready"))
@@ -0,0 +1,55 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend import notifications
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notifications from the outbox, with retries and backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent HTTP sends per batch")
+        parser.add_argument("--timeout", type=float, default=10.0, help="Provider request timeout in seconds")
+        parser.add_argument("--max-attempts", type=int, default=8)
+        parser.add_argument("--backoff", type=float, default=30.0, help="First retry delay in seconds")
+        parser.add_argument("--max-backoff", type=float, default=3600.0)
+        parser.add_argument(
+            "--lease", type=int, default=None,
+            help="Seconds a claimed row stays reserved; defaults to twice the slowest batch, at least 120",
+        )
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when idle")
+        parser.add_argument("--interval", type=float, default=2.0, help="Idle poll interval with --loop")
+
+    def handle(self, *args, **options):
+        # a batch whose sends all time out takes this long; a shorter lease
+        # would let another worker claim and resend rows still in flight
+        slowest = math.ceil(options["batch_size"] / options["workers"]) * options["timeout"]
+        if options["lease"] is None:
+            options["lease"] = max(120, math.ceil(2 * slowest))
+        elif options["lease"] < slowest:
+            raise CommandError(
+                f"--lease must be at least {math.ceil(slowest)} seconds "
+                f"(batch size / workers x timeout)"
+            )
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            while True:
+                batch = notifications.claim_due(options["batch_size"], options["lease"])
+                if batch:
+                    # only the HTTP calls run on the pool; all DB writes stay on this thread
+                    errors = pool.map(lambda n: notifications.deliver(n, options["timeout"]), batch)
+                    sent, failed = notifications.record_results(
+                        dict(zip(batch, errors)),
+                        options["max_attempts"],
+                        options["backoff"],
+                        options["max_backoff"],
+                    )
+                    self.stdout.write(f"Sent {sent}, failed {failed}")
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
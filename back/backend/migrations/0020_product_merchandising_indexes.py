@@ -0,0 +1,61 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0019_product_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_todays_deals', True)), fields=['created_at', 'id'], name='product_todays_deals_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_best_seller', True)), fields=['created_at', 'id'], name='product_best_seller_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['created_at', 'id'], name='product_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_new_arrival', True)), fields=['created_at', 'id'], name='product_new_arrival_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_top_rated', True)), fields=['created_at', 'id'], name='product_top_rated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_trending', True)), fields=['created_at', 'id'], name='product_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_flash_sale', True)), fields=['created_at', 'id'], name='product_flash_sale_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_popular', True)), fields=['created_at', 'id'], name='product_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_premium', True)), fields=['created_at', 'id'], name='product_premium_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_limited_edition', True)), fields=['created_at', 'id'], name='product_limited_edition_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_professional', True)), fields=['created_at', 'id'], name='product_professional_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_creative', True)), fields=['created_at', 'id'], name='product_creative_idx'),
+        ),
+    ]
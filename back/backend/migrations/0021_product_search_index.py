@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE backend_product_fts USING fts5("
+            "name, description, brand, tags, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO backend_product_fts (rowid, name, description, brand, tags) "
+            "SELECT id, name, description, brand, COALESCE(tags, '') FROM backend_product"
+        )
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            "ALTER TABLE backend_product ADD FULLTEXT INDEX product_fulltext_idx (name, description, brand)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS backend_product_fts")
+    elif vendor == 'mysql':
+        schema_editor.execute("ALTER TABLE backend_product DROP INDEX product_fulltext_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0020_product_merchandising_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
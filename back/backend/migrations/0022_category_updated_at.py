@@ -0,0 +1,27 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+from backend.management.commands.recount_categories import recount
+
+
+def recount_categories(apps, schema_editor):
+    # product_count is only maintained incrementally from here on, so start
+    # it from the real counts rather than the hand-entered ones
+    recount(apps.get_model('backend', 'Category'), apps.get_model('backend', 'Product'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0021_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(recount_categories, migrations.RunPython.noop),
+    ]
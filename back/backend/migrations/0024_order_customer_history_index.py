@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0023_notification'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer_email', 'created_at', 'id'], name='order_customer_created_idx'),
+        ),
+    ]
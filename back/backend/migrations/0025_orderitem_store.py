@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:45
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_store(apps, schema_editor):
+    OrderItem = apps.get_model('backend', 'OrderItem')
+    Product = apps.get_model('backend', 'Product')
+    OrderItem.objects.filter(store__isnull=True).update(
+        store_id=Subquery(Product.objects.filter(id=OuterRef('product_id')).values('store_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0024_order_customer_history_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='order_items', to='backend.store'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['store', 'order'], name='orderitem_store_order_idx'),
+        ),
+        migrations.RunPython(backfill_store, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:46
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_product_image(apps, schema_editor):
+    OrderItem = apps.get_model('backend', 'OrderItem')
+    Product = apps.get_model('backend', 'Product')
+    image = Product.objects.filter(id=OuterRef('product_id')).values('image')[:1]
+    OrderItem.objects.update(product_image=Coalesce(Subquery(image), models.Value('')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0025_orderitem_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='product_image',
+            field=models.ImageField(blank=True, upload_to='products/'),
+        ),
+        migrations.RunPython(backfill_product_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.25 on 2026-10-18 17:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from backend.management.commands.backfill_order_customers import link_customers
+
+
+def backfill_customers(apps, schema_editor):
+    Order = apps.get_model('backend', 'Order')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    for _ in link_customers(Order, User):
+        pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('backend', '0028_daily_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='order_customer_created_idx',
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'created_at', 'id'], name='order_customer_fk_created_idx'),
+        ),
+        migrations.RunPython(backfill_customers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0029_order_customer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderNumberWorker',
+            fields=[
+                ('worker_id', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('holder', models.CharField(max_length=32)),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 class Store(models.Model):
@@ -18,10 +19,27 @@ class Category(models.Model):
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to='categories/', blank=True, null=True)  
     product_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
+# query-string name -> boolean column, for the merchandising filter endpoint
+MERCHANDISING_FLAGS = {
+    'todays_deals': 'is_todays_deals',
+    'best_seller': 'is_best_seller',
+    'featured': 'is_featured',
+    'new_arrival': 'is_new_arrival',
+    'top_rated': 'is_top_rated',
+    'trending': 'is_trending',
+    'flash_sale': 'is_flash_sale',
+    'popular': 'is_popular',
+    'premium': 'is_premium',
+    'limited_edition': 'is_limited_edition',
+    'professional': 'is_professional',
+    'creative': 'is_creative',
+}
+
 class Product(models.Model):
     store = models.ForeignKey(Store, related_name='products', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
@@ -54,6 +72,29 @@ class Product(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     colors = models.CharField(max_length=255, blank=True)  # Comma-separated color values
 
+    class Meta:
+        indexes = [
+            # keyset pagination of the catalog listing
+            models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+            models.Index(fields=['store', 'created_at', 'id'], name='product_store_created_id_idx'),
+        ] + [
+            # one small partial index per merchandising collection
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(**{column: True}),
+                name=f'product_{flag}_idx',
+            )
+            for flag, column in MERCHANDISING_FLAGS.items()
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # lets signals.py move product_count when the category changes
+        if 'category_id' in instance.__dict__:
+            instance._loaded_category_id = instance.category_id
+        return instance
+
     def __str__(self):
         return self.name
 # model for multiple images
@@ -108,8 +149,20 @@ class Order(models.Model):
         ('delivered', 'Delivered'),
         ('cancelled', 'Cancelled'),
     ]
+    # statuses an order may move to from each status; delivered and cancelled are final
+    ALLOWED_TRANSITIONS = {
+        'pending': {'processing', 'shipped', 'delivered', 'cancelled'},
+        'processing': {'shipped', 'delivered', 'cancelled'},
+        'shipped': {'delivered'},
+        'delivered': set(),
+        'cancelled': set(),
+    }
 
     order_number = models.CharField(max_length=20, unique=True)
+    # the composite index below covers lookups by customer
+    customer = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.SET_NULL, related_name='orders', db_index=False,
+    )
     customer_name = models.CharField(max_length=100)
     customer_email = models.EmailField()
     customer_phone = models.CharField(max_length=20)
@@ -126,6 +179,12 @@ class Order(models.Model):
     payment_method = models.CharField(max_length=50, default='Cash on Delivery')
     tracking_number = models.CharField(max_length=50, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # a customer's order history, newest first
+            models.Index(fields=['customer', 'created_at', 'id'], name='order_customer_fk_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.order_number} - {self.customer_name}"
 class OrderItem(models.Model):
@@ -134,5 +193,126 @@ class OrderItem(models.Model):
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     product_id = models.IntegerField()
+    # copied from the product at checkout so store admins can find their orders
+    store = models.ForeignKey(Store, null=True, blank=True, on_delete=models.SET_NULL, related_name='order_items')
+    # product image at checkout, so order views never need the product row
+    product_image = models.ImageField(upload_to='products/', blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['store', 'order'], name='orderitem_store_order_idx'),
+        ]
+
     def __str__(self):
         return f"{self.product_name} x {self.quantity}"
+
+
+class OrderStatusEvent(models.Model):
+    order = models.ForeignKey(Order, related_name='status_events', on_delete=models.CASCADE)
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    tracking_number = models.CharField(max_length=50, blank=True)
+    changed_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='order_status_events')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['order', 'created_at'], name='orderstatusevent_order_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id}: {self.from_status} -> {self.to_status}"
+
+
+class SalesRollup(models.Model):
+    """
+    Pre-aggregated sales for one day, keyed by the order's date. Counts by
+    status follow each order's current status; see backend/rollups.py.
+    """
+    day = models.DateField()
+    order_count = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pending_count = models.IntegerField(default=0)
+    processing_count = models.IntegerField(default=0)
+    shipped_count = models.IntegerField(default=0)
+    delivered_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class StoreDailySales(SalesRollup):
+    store = models.ForeignKey(Store, related_name='daily_sales', on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'day'], name='storedailysales_store_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.store_id} {self.day}"
+
+
+class ProductDailySales(SalesRollup):
+    # plain id like OrderItem.product_id, so history survives product deletion
+    product_id = models.IntegerField()
+    store = models.ForeignKey(Store, null=True, blank=True, related_name='product_daily_sales', on_delete=models.SET_NULL)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product_id', 'day'], name='productdailysales_product_day_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['store', 'day'], name='productdailysales_store_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.day}"
+
+
+class OrderNumberWorker(models.Model):
+    """
+    Lease on one order-number worker id. Each process that creates orders
+    holds one row and renews it; see backend/order_numbers.py.
+    """
+    worker_id = models.PositiveSmallIntegerField(primary_key=True)
+    holder = models.CharField(max_length=32)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.worker_id} {self.holder}"
+
+
+class Notification(models.Model):
+    """
+    Outbox row for a message to send after checkout. Written in the order's
+    transaction and delivered by the send_notifications worker.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    ]
+
+    channel = models.CharField(max_length=20, default='whatsapp')
+    recipient = models.CharField(max_length=50)
+    message = models.TextField()
+    order = models.ForeignKey(Order, null=True, blank=True, on_delete=models.SET_NULL, related_name='notifications')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} ({self.status})"
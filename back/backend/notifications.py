@@ -0,0 +1,138 @@
+"""
+Notification outbox.
+
+Checkout only inserts ``Notification`` rows inside the order transaction;
+the ``send_notifications`` worker claims due rows, calls the provider with
+a timeout, and records the outcome. Failed sends are retried with
+exponential backoff up to the worker's ``--max-attempts``, then parked as
+``dead`` for a human to look at.
+"""
+import random
+import uuid
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Notification
+
+DEFAULT_API_URL = "https://api.callmebot.com/whatsapp.php"
+
+
+def enqueue_order_notification(order, order_items):
+    """Queue the admin's WhatsApp alert for ``order``; call inside the order transaction."""
+    whatsapp_number = getattr(settings, "ADMIN_WHATSAPP", None)
+    if not (whatsapp_number and getattr(settings, "CALLMEBOT_API_KEY", None)):
+        return None
+
+    # Build order items string with name and quantity
+    items_str = "\n".join([f"{item.product_name} x {item.quantity}" for item in order_items])
+    message = (
+        f"🛍️ New Order!\n"
+        f"Order No: {order.order_number}\n"
+        f"Customer: {order.customer_name}\n"
+        f"Phone: {order.customer_phone}\n"
+        f"Address: {order.shipping_address}\n"
+        f"Total: Ksh {order.total}\n"
+        f"Items:\n{items_str}"
+    )
+    return Notification.objects.create(recipient=whatsapp_number, message=message, order=order)
+
+
+def send_whatsapp(notification, timeout):
+    response = requests.get(
+        getattr(settings, "CALLMEBOT_API_URL", DEFAULT_API_URL),
+        params={
+            "phone": notification.recipient,
+            "text": notification.message,
+            "apikey": getattr(settings, "CALLMEBOT_API_KEY", ""),
+        },
+        timeout=timeout,
+    )
+    response.raise_for_status()
+
+
+SENDERS = {
+    "whatsapp": send_whatsapp,
+}
+
+
+def claim_due(batch_size, lease_seconds):
+    """
+    Claim up to ``batch_size`` due notifications for this worker. Rows left in
+    ``sending`` by a crashed worker become due again once their lease expires.
+    """
+    now = timezone.now()
+    due = Q(status="pending") | Q(status="sending")
+    due &= Q(next_attempt_at__lte=now)
+    ids = list(
+        Notification.objects.filter(due)
+        .order_by("next_attempt_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    # the conditional UPDATE decides races between workers: a row is only
+    # taken by whoever moves its lease first
+    token = uuid.uuid4().hex
+    Notification.objects.filter(due, id__in=ids).update(
+        status="sending",
+        claim_token=token,
+        next_attempt_at=now + timedelta(seconds=lease_seconds),
+    )
+    return list(Notification.objects.filter(claim_token=token, status="sending"))
+
+
+def backoff(attempts, base_seconds, max_seconds):
+    delay = min(max_seconds, base_seconds * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def deliver(notification, timeout):
+    """Send one notification; returns None on success or the error text."""
+    sender = SENDERS.get(notification.channel)
+    if sender is None:
+        return f"Unknown channel {notification.channel!r}"
+    try:
+        sender(notification, timeout)
+    except requests.HTTPError as e:
+        return f"HTTP {e.response.status_code}"
+    except requests.RequestException as e:
+        # the message would echo the request URL, API key included
+        return e.__class__.__name__
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+    return None
+
+
+def record_results(results, max_attempts, base_seconds=30, max_seconds=3600):
+    """
+    Persist the outcome of a batch: ``results`` maps notification -> error or
+    None. Rows whose lease was taken over by another worker are left alone.
+    """
+    now = timezone.now()
+    sent = {}
+    for notification, error in results.items():
+        if error is None:
+            sent.setdefault(notification.claim_token, []).append(notification.id)
+    for token, ids in sent.items():
+        Notification.objects.filter(id__in=ids, claim_token=token, status="sending").update(
+            status="sent", sent_at=now, attempts=F("attempts") + 1, last_error="",
+        )
+    sent_count = sum(len(ids) for ids in sent.values())
+
+    for notification, error in results.items():
+        if error is None:
+            continue
+        attempts = notification.attempts + 1
+        if attempts >= max_attempts:
+            update = {"status": "dead"}
+        else:
+            update = {"status": "pending", "next_attempt_at": now + backoff(attempts, base_seconds, max_seconds)}
+        Notification.objects.filter(id=notification.id, claim_token=notification.claim_token, status="sending").update(
+            attempts=attempts, last_error=error[:2000], **update
+        )
+    return sent_count, len(results) - sent_count
@@ -0,0 +1,191 @@
+"""
+Order numbers.
+
+Numbers are Snowflake-style ids packed into 63 bits: milliseconds since
+``EPOCH`` (41 bits, good until 2093), a worker id (10 bits) and a per
+millisecond sequence (12 bits). They are generated in process without a
+database round trip, encoded as 13 Crockford base32 characters and sort in
+creation order, so new rows land at the right edge of the unique index.
+
+Each process leases its own worker id from the OrderNumberWorker table, so
+two live processes never share one. The lease is taken on first use (and
+again after a fork) and renewed every few minutes, so only those calls
+touch the database. A process that cannot renew in time takes a fresh
+id before it generates again. ``create_order`` also retries the insert
+on a duplicate number, as a backstop.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Order, OrderNumberWorker
+
+PREFIX = "ORD-"
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Crockford base32: no I, L, O or U, so numbers read back over the phone
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+WIDTH = 13
+
+
+def encode(value):
+    chars = []
+    for _ in range(WIDTH):
+        value, rem = divmod(value, 32)
+        chars.append(ALPHABET[rem])
+    return "".join(reversed(chars))
+
+
+def decode(text):
+    value = 0
+    for char in text.upper():
+        value = value * 32 + ALPHABET.index(char)
+    return value
+
+
+class OrderNumberGenerator:
+    def __init__(self, worker_id):
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def next_id(self):
+        with self._lock:
+            now = max(int(time.time() * 1000), self._last_ms)  # never step back with the clock
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # 4096 numbers used up this millisecond; wait for the next one
+                    while now <= self._last_ms:
+                        now = int(time.time() * 1000)
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return (
+                ((now - EPOCH_MS) << (WORKER_BITS + SEQUENCE_BITS))
+                | (self.worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+    def next_number(self):
+        return PREFIX + encode(self.next_id())
+
+
+LEASE_SECONDS = 600
+CREATE_ATTEMPTS = 3
+
+
+class WorkerLease:
+    """This process's claim on one worker id, held in OrderNumberWorker."""
+
+    def __init__(self):
+        self.holder = uuid.uuid4().hex
+        self.worker_id = None
+        self.expires_at = None  # as last committed
+        self.unconfirmed = False
+
+    def current(self):
+        """The worker id to generate with, taking or renewing the lease as needed."""
+        now = timezone.now()
+        if self.worker_id is not None and self.unconfirmed:
+            # taken or renewed inside a transaction that may have rolled back
+            if not OrderNumberWorker.objects.filter(
+                worker_id=self.worker_id, holder=self.holder, expires_at__gt=now,
+            ).exists():
+                self.worker_id = None
+        elif self.worker_id is not None and now >= self.expires_at - timedelta(seconds=LEASE_SECONDS / 2):
+            expires_at = now + timedelta(seconds=LEASE_SECONDS)
+            renewed = OrderNumberWorker.objects.filter(
+                worker_id=self.worker_id, holder=self.holder, expires_at__gt=now,
+            ).update(expires_at=expires_at)
+            if renewed:
+                self._written(expires_at)
+            elif now >= self.expires_at:
+                self.worker_id = None
+        if self.worker_id is None:
+            self._acquire(now)
+        return self.worker_id
+
+    def _written(self, expires_at):
+        # only trust the new expiry once it is committed
+        self.unconfirmed = True
+
+        def confirm():
+            self.expires_at = expires_at
+            self.unconfirmed = False
+
+        transaction.on_commit(confirm)
+
+    def _acquire(self, now):
+        expires_at = now + timedelta(seconds=LEASE_SECONDS)
+        # reuse a slot whose holder stopped renewing
+        expired = OrderNumberWorker.objects.filter(expires_at__lte=now)
+        for worker_id in expired.values_list("worker_id", flat=True)[:10]:
+            if expired.filter(worker_id=worker_id).update(holder=self.holder, expires_at=expires_at):
+                return self._claimed(worker_id, expires_at)
+
+        used = set(OrderNumberWorker.objects.values_list("worker_id", flat=True))
+        for worker_id in range(MAX_WORKER_ID + 1):
+            if worker_id in used:
+                continue
+            try:
+                with transaction.atomic():
+                    OrderNumberWorker.objects.create(worker_id=worker_id, holder=self.holder, expires_at=expires_at)
+            except IntegrityError:
+                continue  # another process took it first
+            return self._claimed(worker_id, expires_at)
+        raise RuntimeError("All order number worker ids are leased")
+
+    def _claimed(self, worker_id, expires_at):
+        self.worker_id = worker_id
+        self.expires_at = expires_at
+        self._written(expires_at)
+
+
+_generator = None
+_lease = None
+_generator_lock = threading.Lock()
+_generator_pid = None
+
+
+def get_generator():
+    global _generator, _lease, _generator_pid
+    with _generator_lock:
+        # a forked worker must not keep its parent's lease or sequence
+        if _lease is None or _generator_pid != os.getpid():
+            _lease = WorkerLease()
+            _generator = None
+            _generator_pid = os.getpid()
+        worker_id = _lease.current()
+        if _generator is None or _generator.worker_id != worker_id:
+            _generator = OrderNumberGenerator(worker_id)
+        return _generator
+
+
+def next_order_number():
+    return get_generator().next_number()
+
+
+def create_order(**fields):
+    """Order.objects.create() with a fresh number, retried if the number is already taken."""
+    for attempt in range(CREATE_ATTEMPTS):
+        number = next_order_number()
+        try:
+            with transaction.atomic():
+                return Order.objects.create(order_number=number, **fields)
+        except IntegrityError:
+            if attempt == CREATE_ATTEMPTS - 1 or not Order.objects.filter(order_number=number).exists():
+                raise
@@ -0,0 +1,63 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+def is_paginated(request):
+    """Listing endpoints only paginate when the client asks for it."""
+    return "cursor" in request.GET or "limit" in request.GET
+
+
+def page_size(request, default=DEFAULT_PAGE_SIZE):
+    try:
+        limit = int(request.GET.get("limit", default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([value.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (datetime, pk) from a cursor, raising ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        value = parse_datetime(value)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if value is None or not isinstance(pk, int):
+        raise ValueError("Invalid cursor")
+    return value, pk
+
+
+def keyset_page(queryset, request, field="created_at"):
+    """
+    Return (rows, next_cursor) for one newest-first page of ``queryset``,
+    keyed on (field, id) so every page is a bounded index range scan.
+    """
+    limit = page_size(request)
+    queryset = queryset.order_by(f"-{field}", "-id")
+
+    cursor = request.GET.get("cursor")
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk})
+        )
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
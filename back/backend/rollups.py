@@ -0,0 +1,145 @@
+"""
+Daily sales rollups.
+
+StoreDailySales and ProductDailySales hold one row per (store, day) and
+(product, day), keyed by ``Order.date``. Checkout adds to them through
+``record_orders`` and status changes move counts between the status
+columns through ``record_transitions``, both inside the caller's
+transaction. Every change is an F() increment, so concurrent orders never
+overwrite each other's totals. ``rebuild_days`` recomputes a date range
+from the order history (see the rebuild_sales_rollups command).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Max, Q, Sum, Value, When
+
+from .models import Order, OrderItem, ProductDailySales, StoreDailySales
+
+STATUS_FIELDS = {value: f"{value}_count" for value, _ in Order.STATUS_CHOICES}
+COUNTERS = ["order_count", "units", "revenue", *STATUS_FIELDS.values()]
+
+
+def _deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def _apply(model, key_field, deltas, stores=None):
+    """Add ``deltas`` ({(key, day): {counter: delta}}) to ``model`` rows, creating missing ones."""
+    by_day = defaultdict(dict)
+    for (key, day), counters in deltas.items():
+        by_day[day][key] = counters
+
+    for day, rows in by_day.items():
+        model.objects.bulk_create([
+            model(day=day, **{key_field: key}, **({"store_id": stores.get(key)} if stores else {}))
+            for key in rows
+        ], ignore_conflicts=True)
+
+        update = {}
+        for field in COUNTERS:
+            whens = [
+                When(**{key_field: key}, then=Value(counters[field]))
+                for key, counters in rows.items() if counters.get(field)
+            ]
+            if not whens:
+                continue
+            output = DecimalField(max_digits=14, decimal_places=2) if field == "revenue" else IntegerField()
+            update[field] = F(field) + Case(*whens, default=Value(0), output_field=output)
+        if update:
+            model.objects.filter(day=day, **{f"{key_field}__in": list(rows)}).update(**update)
+
+
+def record_orders(orders):
+    """Add newly placed orders; ``orders`` is an iterable of (order, order_items)."""
+    by_store = _deltas()
+    by_product = _deltas()
+    product_stores = {}
+
+    for order, items in orders:
+        status_field = STATUS_FIELDS[order.status]
+        seen_products, seen_stores = set(), set()
+        for item in items:
+            product_stores[item.product_id] = item.store_id
+            for deltas, key, seen in (
+                (by_product, item.product_id, seen_products),
+                (by_store, item.store_id, seen_stores),
+            ):
+                if key is None:
+                    continue
+                counters = deltas[(key, order.date)]
+                counters["units"] += item.quantity
+                counters["revenue"] += item.price * item.quantity
+                # an order counts once per store and product, however many lines it has
+                if key not in seen:
+                    seen.add(key)
+                    counters["order_count"] += 1
+                    counters[status_field] += 1
+
+    _apply(StoreDailySales, "store_id", by_store)
+    _apply(ProductDailySales, "product_id", by_product, product_stores)
+
+
+def record_transitions(from_statuses, to_status):
+    """Move orders ({order_id: previous status}) to ``to_status`` in the status counts."""
+    if not from_statuses:
+        return
+    by_store = _deltas()
+    by_product = _deltas()
+    product_stores = {}
+    to_field = STATUS_FIELDS[to_status]
+
+    lines = (
+        OrderItem.objects.filter(order_id__in=list(from_statuses))
+        .values_list("order_id", "order__date", "store_id", "product_id")
+        .distinct()
+    )
+    store_orders = set()
+    for order_id, day, store_id, product_id in lines:
+        from_field = STATUS_FIELDS[from_statuses[order_id]]
+        product_stores[product_id] = store_id
+        keys = [(by_product, product_id)]
+        if store_id is not None and (order_id, store_id) not in store_orders:
+            store_orders.add((order_id, store_id))
+            keys.append((by_store, store_id))
+        for deltas, key in keys:
+            counters = deltas[(key, day)]
+            counters[from_field] -= 1
+            counters[to_field] += 1
+
+    _apply(StoreDailySales, "store_id", by_store)
+    _apply(ProductDailySales, "product_id", by_product, product_stores)
+
+
+def _aggregates():
+    return {
+        "order_count": Count("order", distinct=True),
+        "units": Sum("quantity"),
+        "revenue": Sum(F("price") * F("quantity"), output_field=DecimalField(max_digits=14, decimal_places=2)),
+        **{
+            field: Count("order", distinct=True, filter=Q(order__status=value))
+            for value, field in STATUS_FIELDS.items()
+        },
+    }
+
+
+def rebuild_days(start, end, batch_size=1000):
+    """Recompute the rollups for orders dated ``start``..``end`` inclusive; returns rows written."""
+    items = OrderItem.objects.filter(order__date__gte=start, order__date__lte=end).order_by()
+    with transaction.atomic():
+        StoreDailySales.objects.filter(day__gte=start, day__lte=end).delete()
+        ProductDailySales.objects.filter(day__gte=start, day__lte=end).delete()
+
+        store_rows = [
+            StoreDailySales(store_id=row.pop("store_id"), day=row.pop("order__date"), **row)
+            for row in items.exclude(store=None).values("store_id", "order__date").annotate(**_aggregates())
+        ]
+        product_rows = [
+            ProductDailySales(
+                product_id=row.pop("product_id"), day=row.pop("order__date"), store_id=row.pop("product_store"), **row
+            )
+            for row in items.values("product_id", "order__date").annotate(product_store=Max("store"), **_aggregates())
+        ]
+        StoreDailySales.objects.bulk_create(store_rows, batch_size=batch_size)
+        ProductDailySales.objects.bulk_create(product_rows, batch_size=batch_size)
+    return len(store_rows) + len(product_rows)
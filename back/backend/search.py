@@ -0,0 +1,96 @@
+"""
+Full-text product search.
+
+On SQLite a standalone FTS5 table (``backend_product_fts``) mirrors the
+searchable columns with ``rowid`` = product id, kept current from the
+Product signals. On MySQL migration 0021 adds a FULLTEXT index over
+name, description and brand (JSON columns cannot be FULLTEXT indexed, so
+tags are not searched there). Any other backend falls back to icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Product
+
+FTS_TABLE = "backend_product_fts"
+
+# bm25 column weights: name, description, brand, tags
+FTS_WEIGHTS = (10.0, 1.0, 5.0, 3.0)
+
+
+def _tags_text(tags):
+    return " ".join(str(tag) for tag in tags) if isinstance(tags, list) else ""
+
+
+def index_product(product):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, brand, tags) VALUES (%s, %s, %s, %s, %s)",
+            [product.pk, product.name, product.description, product.brand, _tags_text(product.tags)],
+        )
+
+
+def unindex_product(product_id):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product_id])
+
+
+def rebuild_index():
+    """Repopulate the FTS table from scratch, e.g. after bulk imports."""
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, brand, tags) "
+            f"SELECT id, name, description, brand, COALESCE(tags, '') FROM {Product._meta.db_table}"
+        )
+
+
+def _terms(query):
+    return re.findall(r"\w+", query)
+
+
+def search_product_ids(query, offset, limit):
+    """Return up to ``limit`` product ids matching ``query``, best match first."""
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == "sqlite":
+        # every term must match, each as a prefix ("pho" finds "phone")
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s OFFSET %s",
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    if connection.vendor == "mysql":
+        score = RawSQL(
+            "MATCH (name, description, brand) AGAINST (%s IN NATURAL LANGUAGE MODE)",
+            [" ".join(terms)],
+        )
+        products = (
+            Product.objects.annotate(score=score)
+            .filter(score__gt=0)
+            .order_by("-score", "-id")
+        )
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= Q(name__icontains=term) | Q(description__icontains=term) | Q(brand__icontains=term)
+        products = Product.objects.filter(condition).order_by("-created_at", "-id")
+
+    return list(products.values_list("id", flat=True)[offset:offset + limit])
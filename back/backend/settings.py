@@ -31,6 +31,33 @@ SECRET_KEY = 'django-insecure-2m%l+wey#g1e&uc_%%^x81lk$t=()o0q-2s%&gd(7^c2rl6kj*
 #whatsapp 
 ADMIN_WHATSAPP = "+254721108063"
 CALLMEBOT_API_KEY = "3645711"
+CALLMEBOT_API_URL = "https://api.callmebot.com/whatsapp.php"
+
+# Token authentication cache (backend/authentication.py). Point
+# TOKEN_CACHE_ALIAS at a cache shared by all workers, e.g. Redis, to share
+# validated tokens between them.
+TOKEN_CACHE_SIZE = 10000
+TOKEN_CACHE_TTL = 30
+TOKEN_CACHE_SHARED_TTL = 300
+TOKEN_CACHE_ALIAS = None
+
+# Login/registration throttling (backend/throttling.py) and the password
+# hashing pool (backend/hashing.py)
+LOGIN_THROTTLE_RATES = {"ip": "20/min", "account": "5/min"}
+LOGIN_THROTTLE_CACHE_ALIAS = None
+PASSWORD_HASHING_WORKERS = None  # default: half the CPU cores
+PASSWORD_HASHING_QUEUE = 32
+# processes hashing passwords for api/users/import/ (default: CPU count)
+USER_IMPORT_WORKERS = None
+
+# Django's default hashers, with PBKDF2 run on the hashing pool
+PASSWORD_HASHERS = [
+    "backend.hashing.PooledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
@@ -75,7 +102,7 @@ INSTALLED_APPS = [
 REST_FRAMEWORK = {
         
         'DEFAULT_AUTHENTICATION_CLASSES': (
-            'rest_framework.authentication.TokenAuthentication',
+            'backend.authentication.CachedTokenAuthentication',
         ),
     }
 
@@ -137,6 +164,18 @@ DATABASES = {
 }
 
 
+# Product JSON snapshots (see backend/catalog.py) live here. Point this at a
+# shared backend such as Redis or Memcached when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yobra',
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -0,0 +1,83 @@
+"""
+Keeps derived catalog data in step with product writes.
+
+Product snapshots are versioned by ``Product.updated_at``; writes to
+related rows that change a product's payload bump that timestamp. The
+search index is updated row by row after the write commits, and
+``Category.product_count`` is moved with atomic F() updates.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from . import authentication, catalog, search
+from .models import Category, Product, ProductImage
+
+
+def _adjust_product_count(category_id, delta):
+    if category_id is None:
+        return
+    categories = Category.objects.filter(pk=category_id)
+    if delta < 0:
+        categories = categories.filter(product_count__gte=-delta)
+    categories.update(product_count=F("product_count") + delta, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, "_loaded_category_id", instance.category_id)
+    if previous != instance.category_id:
+        _adjust_product_count(previous, -1)
+        _adjust_product_count(instance.category_id, 1)
+        transaction.on_commit(catalog.invalidate_category_listing)
+    instance._loaded_category_id = instance.category_id
+    transaction.on_commit(lambda: search.index_product(instance))
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    _adjust_product_count(instance.category_id, -1)
+    product_id = instance.pk
+    transaction.on_commit(lambda: search.unindex_product(product_id))
+    transaction.on_commit(catalog.invalidate_category_listing)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender, instance, **kwargs):
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def category_changed(sender, instance, created, **kwargs):
+    if not created:
+        Product.objects.filter(category=instance).update(updated_at=timezone.now())
+    transaction.on_commit(catalog.invalidate_category_listing)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    transaction.on_commit(catalog.invalidate_category_listing)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # login only stamps last_login, which is not part of the cached snapshot
+    if created or (update_fields and set(update_fields) == {"last_login"}):
+        return
+    authentication.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    authentication.invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    authentication.invalidate_tokens([instance.key])
@@ -0,0 +1,106 @@
+"""
+Token-bucket throttles for the credential endpoints.
+
+Each client IP and each account (the submitted email) gets a bucket that
+holds up to N tokens and refills at N per period, from rates written like
+DRF's ("20/min"). The IP is the connection's REMOTE_ADDR, never a
+forwarded header; behind a reverse proxy, have the server set REMOTE_ADDR
+to the real client. A request spends one token from both buckets and is
+rejected with 429 before any password hashing happens if either is empty.
+
+Buckets live in a bounded in-process LRU, or in the cache named by
+``LOGIN_THROTTLE_CACHE_ALIAS`` so that all workers share them. Shared
+buckets are read and written without a lock, so a few requests can slip
+through a near-empty bucket under contention.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_RATES = {"ip": "20/min", "account": "5/min"}
+MAX_LOCAL_BUCKETS = 50000
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """Parse a DRF-style rate such as "20/min" into (20, 60)."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+class LocalBuckets:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_per_second, now):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+_local_buckets = LocalBuckets(MAX_LOCAL_BUCKETS)
+
+
+def take_token(key, rate, now=None):
+    """Spend one token from ``key``'s bucket; returns (allowed, seconds until a token is free)."""
+    capacity, duration = parse_rate(rate)
+    refill = capacity / duration
+    now = time.time() if now is None else now
+
+    alias = getattr(settings, "LOGIN_THROTTLE_CACHE_ALIAS", None)
+    if alias:
+        cache = caches[alias]
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        cache.set(key, (tokens, now), duration)
+    else:
+        allowed, tokens = _local_buckets.take(key, capacity, refill, now)
+
+    return allowed, 0 if allowed else (1 - tokens) / refill
+
+
+class CredentialThrottle(BaseThrottle):
+    """Per-IP and per-account token buckets for login and registration."""
+    scope = "login"
+
+    def allow_request(self, request, view):
+        rates = {**DEFAULT_RATES, **getattr(settings, "LOGIN_THROTTLE_RATES", {})}
+        # not get_ident(): without NUM_PROXIES it trusts X-Forwarded-For,
+        # which a client can rotate to get a fresh bucket per request
+        keys = [("ip", request.META.get("REMOTE_ADDR") or "unknown")]
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if isinstance(email, str) and email.strip():
+            keys.append(("account", email.strip().lower()))
+
+        self.retry_after = 0
+        allowed = True
+        for kind, ident in keys:
+            ok, wait = take_token(f"throttle:{self.scope}:{kind}:{ident}", rates[kind])
+            if not ok:
+                allowed = False
+                self.retry_after = max(self.retry_after, wait)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class RegisterThrottle(CredentialThrottle):
+    scope = "register"
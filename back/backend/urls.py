@@ -41,6 +41,10 @@ urlpatterns = [
     path('api/delete/<int:productId>/', views.delete_product, name='delete_product'),
     path('api/getProducts/', views.get_products, name='get_products'),
     path('api/getProduct/<int:productId>/', views.get_product, name='get_product'),
+    path('api/products/batch/', views.get_products_batch, name='get_products_batch'),
+    path('api/products/export/', views.export_products, name='export_products'),
+    path('api/products/filter/', views.filter_products, name='filter_products'),
+    path('api/search/', views.search_products, name='search_products'),
     path("api/products/<int:productId>/toggle-deal/", views.toggle_deal, name="toggle-deal"),
     path("api/products/edit/<int:productId>/", views.edit_product, name = "edit_product"),
     path('api/updateProduct/<int:productId>/', views.update_product, name='update_product'),
@@ -48,12 +52,16 @@ urlpatterns = [
     path('api/get_cart/', views.get_cart , name="get_cart"),
     path('api/remove_from_cart/', views.remove_from_cart, name = 'remove_from_cart'),
     path('api/logout/', views.logout_user, name ="logout_user"),
+    path('api/auth/cache_stats/', views.token_cache_stats, name="token_cache_stats"),
     path('api/wishlist/',views.toggle_wishlist, name = "toggle_wishlist"),
     path('api/create_order/', views.create_order, name ="create_order"),
     path('api/getOrders/', views.getOrders , name ="totalOrders"),
     path('api/getOrder/<int:orderId>/', views.getOrder, name="getOrder"),
     path('api/orders/<int:orderId>/update_status/', views.update_order_status, name="update_order_status"),
+    path('api/orders/bulk_update_status/', views.bulk_update_order_status, name="bulk_update_order_status"),
+    path('api/sales/daily/', views.get_daily_sales, name="get_daily_sales"),
     path('api/addUser/', views.addUser, name="addUser"),
+    path('api/users/import/', views.import_users, name="import_users"),
     path('api/getUser/<int:userid>/',views.getUser,  name = "getUser"),
     path('api/updateuser/<int:userid>/', views.updateuser , name ="updateuser"),
     path('api/getUsers/', views.getUsers, name="getUsers"),
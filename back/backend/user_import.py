@@ -0,0 +1,165 @@
+"""
+Bulk customer import from CSV or JSON Lines.
+
+Rows are read one at a time from the uploaded or on-disk file and handled
+in chunks. Each chunk is checked against existing usernames with a single
+query and its passwords are hashed on a process pool. The new users are
+then written with one bulk_create. Columns match addUser: email
+(required), password, name or first_name, last_name and role
+("admin" or anything else for a customer). Rows without a password get
+an unusable one, so the user must reset it before signing in.
+"""
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from . import hashing
+
+FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_rows(stream, fmt):
+    """Yield (line_number, row dict or error message) from a binary stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, "Invalid JSON"
+            continue
+        yield line_number, row if isinstance(row, dict) else "Expected a JSON object"
+
+
+def _clean(row):
+    email = str(row.get("email") or "").strip()
+    validate_email(email)
+    if len(email) > 150:
+        raise ValidationError("Email is longer than 150 characters")
+    name = row.get("name") or row.get("first_name") or ""
+    password = row.get("password") or None
+    is_admin = row.get("role") == "admin"
+    return User(
+        username=email,
+        email=email,
+        first_name=str(name).strip()[:150],
+        last_name=str(row.get("last_name") or "").strip()[:150],
+        is_superuser=is_admin,
+        is_staff=is_admin,
+    ), password
+
+
+class UserImporter:
+    def __init__(self, chunk_size=1000, workers=None):
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.created = 0
+        self.duplicates = 0
+        self.errors = []
+        self.error_count = 0
+        self._pool = None
+
+    def error(self, line, message, email=""):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "email": email, "error": message})
+
+    def run(self, stream, fmt):
+        chunk = []
+        try:
+            for line, row in read_rows(stream, fmt):
+                if isinstance(row, str):
+                    self.error(line, row)
+                    continue
+                chunk.append((line, row))
+                if len(chunk) >= self.chunk_size:
+                    self.import_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk)
+        except (UnicodeDecodeError, csv.Error) as e:
+            self.error(None, f"Could not read file: {e}")
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+        return self.report()
+
+    def import_chunk(self, chunk):
+        users = []
+        for line, row in chunk:
+            try:
+                user, password = _clean(row)
+            except ValidationError as e:
+                self.error(line, e.messages[0], str(row.get("email") or ""))
+                continue
+            users.append((line, user, password))
+
+        # one query for the whole chunk instead of exists() per row
+        taken = set(
+            User.objects.filter(username__in=[user.username for _, user, _ in users])
+            .values_list("username", flat=True)
+        )
+        new = []
+        for line, user, password in users:
+            if user.username in taken:
+                self.duplicates += 1
+                self.error(line, "User already exists", user.username)
+                continue
+            taken.add(user.username)  # later rows in the same file
+            new.append((line, user, password))
+        if not new:
+            return
+
+        for (_, user, _), encoded in zip(new, self.hash_passwords([password for _, _, password in new])):
+            user.password = encoded
+        # a username registered since the check above is skipped, not fatal
+        User.objects.bulk_create([user for _, user, _ in new], ignore_conflicts=True)
+
+        # ignore_conflicts hides which rows were skipped; each password hash
+        # is salted, so a matching one means the row is ours
+        stored = dict(
+            User.objects.filter(username__in=[user.username for _, user, _ in new])
+            .values_list("username", "password")
+        )
+        for line, user, _ in new:
+            if stored.get(user.username) == user.password:
+                self.created += 1
+            else:
+                self.duplicates += 1
+                self.error(line, "User already exists", user.username)
+
+    def hash_passwords(self, passwords):
+        if self.workers == 1 or len(passwords) < 2:
+            return hashing.hash_many(passwords)
+        if self._pool is None:
+            # spawn, not fork: the web server that calls this may be threaded
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=hashing.init_process,
+            )
+        size = max(1, len(passwords) // (self.workers * 4))
+        batches = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        return [encoded for batch in self._pool.map(hashing.hash_many, batches) for encoded in batch]
+
+    def report(self):
+        return {
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "errorCount": self.error_count,
+            "errors": self.errors,
+        }
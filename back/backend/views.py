@@ -1,25 +1,32 @@
-import random
-import string
+from datetime import date, timedelta
+from decimal import Decimal
 from urllib import request
 from django.shortcuts import render
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import authenticate, login, logout
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, Exists, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 import os
 import json
-from .models import Category, Product, Cart, Wishlist, Order, OrderItem,ProductImage, Store
-import requests
+from .models import Category, Product, Cart, Wishlist, Order, OrderItem,ProductImage, Store, MERCHANDISING_FLAGS
+from .models import ProductDailySales, StoreDailySales
 
 from .serializers import CategorySerializer,CartSerializer
+from .pagination import is_paginated, keyset_page, page_size
+from .throttling import CredentialThrottle, RegisterThrottle
+from . import authentication, catalog, fulfilment, hashing, inventory, notifications, order_numbers, rollups, search, user_import
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.authtoken.models import Token
 
@@ -33,30 +40,47 @@ class FrontendAppView(TemplateView):
         # Override to use the React build index.html
         return [os.path.join(settings.FRONTEND_DIST_DIR, 'index.html')]
 
+def hashing_busy():
+    return Response(
+        {"detail": "Too many sign-in attempts right now, try again shortly"},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    )
+
+
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterThrottle])
 def register_user(request):
     data = request.data
     if User.objects.filter(username=data["email"]).exists():
         return Response({"detail": "User already exists"}, status=status.HTTP_400_BAD_REQUEST)
-    
+
+    try:
+        password = make_password(data["password"])
+    except hashing.HashingBusy:
+        return hashing_busy()
     user = User.objects.create(
         first_name=data.get("name", ""),
         username=data["email"],  # Django uses "username", we’ll store email here
         email=data["email"],
-        password=make_password(data["password"])
+        password=password
     )
     return Response({"detail": "User created successfully"}, status=status.HTTP_201_CREATED)
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([CredentialThrottle])
 def login_user(request):
     email = request.data.get("email")
     password = request.data.get("password")
 
-    user = authenticate(request, username=email, password=password)
+    try:
+        user = authenticate(request, username=email, password=password)
+    except hashing.HashingBusy:
+        return hashing_busy()
     if user is not None:
          token, _ = Token.objects.get_or_create(user=user)
          return Response({
@@ -81,11 +105,6 @@ def get_profile(request):
     })
 
 
-def generate_order_number():
-        return "ORD-" + ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-
-
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def getUser(request,userid):
@@ -109,61 +128,60 @@ def create_order(request):
     if not items:
         return JsonResponse({'error': 'No items provided'}, status=400)
 
-    # Create the main order object
-    order = Order.objects.create(
-        order_number=generate_order_number(),
-        customer_name=user.first_name + " " + user.last_name,
-        customer_email=user.email,
-        customer_phone=data.get('phone'),
-        shipping_address=data.get('address'),
-        subtotal=data.get('subtotal'),
-        shipping=data.get('shipping', 0.00),
-        total=data.get('total'),
-        payment_method=data.get('payment_method', 'Cash on Delivery'),
-    )
-
-    # Create order items for each item in payload
-    for item in items:
-        product = Product.objects.get(id=item['product_id'])
-        OrderItem.objects.create(
-            order=order,
-            product_id=item['product_id'],
-            product_name=product.name,
-            quantity=item['quantity'],
-            price=product.price,
-            )
+    try:
+        lines = [(int(item['product_id']), int(item.get('quantity', 1))) for item in items]
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({'error': 'Each item needs a numeric product_id and quantity'}, status=400)
+    if any(quantity < 1 for _, quantity in lines):
+        return JsonResponse({'error': 'Quantities must be at least 1'}, status=400)
 
-    # Notify admin via WhatsApp
-    whatsapp_number = getattr(settings, "ADMIN_WHATSAPP", None)
-    api_key = getattr(settings, "CALLMEBOT_API_KEY", None)
-    # Build order items string with name and quantity
-    items_str = "\n".join([f"{item.product_name} x {item.quantity}" for item in order.items.all()])
-    if whatsapp_number and api_key:
-
-        message = (
-            f"🛍️ New Order!\n"
-            f"Order No: {order.order_number}\n"
-            f"Customer: {order.customer_name}\n"
-            f"Phone: {order.customer_phone}\n"
-            f"Address: {order.shipping_address}\n"
-            f"Total: Ksh {order.total}\n"
-            f"Items:\n{items_str}"
-        )
-       
-        try:
+    quantities = {}
+    for product_id, quantity in lines:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
 
-            cart = Cart.objects.filter(user=request.user)
-            cart.delete()
+    products = Product.objects.only("id", "name", "price", "store", "image").in_bulk(quantities)
+    missing = sorted(product_id for product_id in quantities if product_id not in products)
+    if missing:
+        return JsonResponse({'error': 'Products not found', 'missing': missing}, status=400)
 
-        except Cart.DoesNotExist:
-            pass
-        try:
-            requests.get(
-                f"https://api.callmebot.com/whatsapp.php?phone={whatsapp_number}"
-                f"&text={message}&apikey={api_key}"
+    try:
+        with transaction.atomic():
+            inventory.reserve_stock(quantities)
+
+            # Create the main order object; retried on the rare duplicate number
+            order = order_numbers.create_order(
+                customer_name=user.first_name + " " + user.last_name,
+                customer=user,
+                customer_email=user.email,
+                customer_phone=data.get('phone'),
+                shipping_address=data.get('address'),
+                subtotal=data.get('subtotal'),
+                shipping=data.get('shipping', 0.00),
+                total=data.get('total'),
+                payment_method=data.get('payment_method', 'Cash on Delivery'),
             )
-        except Exception as e:
-            print("⚠️ WhatsApp notification failed:", e)
+
+            # Create order items for each item in payload
+            order_items = OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product_id=product_id,
+                    product_name=products[product_id].name,
+                    quantity=quantity,
+                    price=products[product_id].price,
+                    store_id=products[product_id].store_id,
+                    product_image=products[product_id].image.name or "",
+                )
+                for product_id, quantity in lines
+            ])
+
+            Cart.objects.filter(user=user).delete()
+
+            # Notify admin via WhatsApp; the send_notifications worker delivers it
+            rollups.record_orders([(order, order_items)])
+            notifications.enqueue_order_notification(order, order_items)
+    except inventory.InsufficientStock as e:
+        return JsonResponse({'error': 'Insufficient stock', 'items': e.shortages}, status=409)
 
     return Response({"message": "Order created successfully"}, status=status.HTTP_201_CREATED)
 
@@ -174,35 +192,47 @@ def getOrder(request, orderId):
     if not user.is_superuser:
         return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
     try:
-        order = Order.objects.get(id=orderId)
-        order_data = {
-            "id": order.id,
-            "orderNumber": order.order_number,
-            "customerName": order.customer_name,
-            "customerEmail": order.customer_email,
-            "customerPhone": order.customer_phone,
-            "shippingAddress": order.shipping_address,
-            "date": order.date.isoformat(),
-            "status": order.status,
-            "subtotal": float(order.subtotal),
-            "shipping": float(order.shipping),
-            "tax": float(order.tax),
-            "total": float(order.total),
-            "paymentMethod": order.payment_method,
-            "items": [
-                {
-                    "productName": item.product_name,
-                    "quantity": item.quantity,
-                    "price": float(item.price),
-                    "image": Product.objects.get(id=item.product_id).image.url if Product.objects.filter(id=item.product_id).exists() else None,
-                }
-                for item in order.items.all()
-            ],
-        }
-        return Response(order_data)
+        order = Order.objects.prefetch_related("items").get(id=orderId)
     except Order.DoesNotExist:
         return Response({"error": "Order not found"}, status=status.HTTP_404_NOT_FOUND)
 
+    items = list(order.items.all())
+    # Lines from before checkout stored the image are resolved in one lookup
+    legacy_ids = {item.product_id for item in items if not item.product_image}
+    products = Product.objects.only("id", "image").in_bulk(legacy_ids) if legacy_ids else {}
+
+    def item_image(item):
+        image = item.product_image
+        if not image and item.product_id in products:
+            image = products[item.product_id].image
+        return request.build_absolute_uri(image.url) if image else None
+
+    order_data = {
+        "id": order.id,
+        "orderNumber": order.order_number,
+        "customerName": order.customer_name,
+        "customerEmail": order.customer_email,
+        "customerPhone": order.customer_phone,
+        "shippingAddress": order.shipping_address,
+        "date": order.date.isoformat(),
+        "status": order.status,
+        "subtotal": float(order.subtotal),
+        "shipping": float(order.shipping),
+        "tax": float(order.tax),
+        "total": float(order.total),
+        "paymentMethod": order.payment_method,
+        "items": [
+            {
+                "productName": item.product_name,
+                "quantity": item.quantity,
+                "price": float(item.price),
+                "image": item_image(item),
+            }
+            for item in items
+        ],
+    }
+    return Response(order_data)
+
 
 # API to update order status
 @api_view(["POST"])
@@ -216,13 +246,67 @@ def update_order_status(request, orderId):
     if new_status not in dict(Order.STATUS_CHOICES):
         return Response({"error": "Invalid status"}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        order = Order.objects.get(id=orderId)
-        order.status = new_status
-        order.save()
-        return Response({"message": "Order status updated successfully"})
-    except Order.DoesNotExist:
+    current = Order.objects.filter(id=orderId).values_list("status", flat=True).first()
+    if current is None:
         return Response({"error": "Order not found"}, status=status.HTTP_404_NOT_FOUND)
+    if current == new_status:
+        return Response({"message": "Order status updated successfully"})
+
+    # admins may set any status here, including undoing a mistaken cancel or
+    # delivery; the bulk endpoint is the one that enforces ALLOWED_TRANSITIONS
+    tracking_number = request.data.get("trackingNumber")
+    tracking_numbers = {orderId: tracking_number} if tracking_number else None
+    fulfilment.transition_orders([orderId], new_status, user, tracking_numbers, force=True)
+    return Response({"message": "Order status updated successfully"})
+
+
+MAX_BULK_ORDERS = 500
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def bulk_update_order_status(request):
+    """
+    Move many orders to one status: {"ids": [...], "status": "shipped",
+    "trackingNumbers": {"<id>": "..."}}. Orders whose current status does
+    not allow the move are left alone and reported under "skipped".
+    """
+    user = request.user
+    if not user.is_superuser:
+        return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+
+    new_status = request.data.get("status")
+    if new_status not in dict(Order.STATUS_CHOICES):
+        return Response({"error": "Invalid status"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        ids = request_ids(request)
+    except ValueError:
+        return Response({"error": "ids must be a list of integers"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        tracking_numbers = {
+            int(pk): str(number)
+            for pk, number in (request.data.get("trackingNumbers") or {}).items()
+            if number
+        }
+    except (AttributeError, TypeError, ValueError):
+        return Response(
+            {"error": "trackingNumbers must map order ids to tracking numbers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not ids:
+        return Response({"error": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > MAX_BULK_ORDERS:
+        return Response({"error": f"At most {MAX_BULK_ORDERS} orders per request"}, status=status.HTTP_400_BAD_REQUEST)
+    if any(len(number) > 50 for number in tracking_numbers.values()):
+        return Response({"error": "Tracking numbers are at most 50 characters"}, status=status.HTTP_400_BAD_REQUEST)
+
+    events = fulfilment.transition_orders(ids, new_status, user, tracking_numbers)
+    updated = {event.order_id for event in events}
+    return Response({
+        "updated": sorted(updated),
+        "skipped": sorted(set(ids) - updated),
+        "allowedFrom": fulfilment.allowed_from(new_status),
+    })
 
 
 #users
@@ -242,16 +326,43 @@ def addUser(request):
     is_superuser_flag = True if data.get("role") == "admin" else False
     is_staff_flag = is_superuser_flag
 
+    try:
+        password = make_password(data["password"])
+    except hashing.HashingBusy:
+        return hashing_busy()
     new_user = User.objects.create(
         first_name=data.get("name", ""),
         username=data["email"],  
 
         email=data["email"],
-        password=make_password(data["password"]),
+        password=password,
         is_superuser=is_superuser_flag,
         is_staff=is_staff_flag,
     )
     return Response({"detail": "User created successfully"}, status=status.HTTP_201_CREATED)    
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def import_users(request):
+    """
+    Bulk-create customers from an uploaded CSV or JSON Lines "file"
+    ("type": "csv" or "jsonl", default from the file name) and report
+    the rows that were rejected.
+    """
+    if not request.user.is_superuser:
+        return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "file is required"}, status=status.HTTP_400_BAD_REQUEST)
+    fmt = request.data.get("type") or ("jsonl" if upload.name.endswith((".jsonl", ".ndjson")) else "csv")
+    if fmt not in user_import.FORMATS:
+        return Response({"error": "type must be csv or jsonl"}, status=status.HTTP_400_BAD_REQUEST)
+
+    importer = user_import.UserImporter(workers=getattr(settings, "USER_IMPORT_WORKERS", None))
+    report = importer.run(upload.file, fmt)
+    return Response(report, status=status.HTTP_201_CREATED if report["created"] else status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def updateuser(request,userid):
@@ -278,6 +389,8 @@ def updateuser(request,userid):
         return Response({"success": "user updated successfully"})
     except User.DoesNotExist:
         return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+    except hashing.HashingBusy:
+        return hashing_busy()
     
 
 @api_view(['GET'])
@@ -289,35 +402,69 @@ def getUsers(request):
     if not user.is_superuser:
         return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
 
-    users = User.objects.all()
-    user_list = []
+    # Order totals and the latest contact details come from correlated
+    # subqueries on the customer FK, so the page is one query however many
+    # orders each customer has
+    orders = Order.objects.filter(customer=OuterRef("pk")).order_by()
+    latest = orders.order_by("-created_at", "-id")
+    users = (
+        User.objects.only("id", "username", "first_name", "last_name", "email", "date_joined", "is_active", "is_staff")
+        .annotate(
+            total_orders=Coalesce(Subquery(
+                orders.values("customer").annotate(count=Count("id")).values("count")
+            ), 0),
+            total_spent=Coalesce(Subquery(
+                orders.values("customer").annotate(spent=Sum("total")).values("spent")
+            ), Value(Decimal("0")), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            latest_address=Subquery(latest.values("shipping_address")[:1]),
+            latest_phone=Subquery(latest.values("customer_phone")[:1]),
+        )
+    )
 
+    search_term = request.GET.get("search", "").strip()
+    if search_term:
+        users = users.filter(
+            Q(first_name__icontains=search_term)
+            | Q(last_name__icontains=search_term)
+            | Q(email__icontains=search_term)
+            | Q(username__icontains=search_term)
+        )
+
+    next_cursor = None
+    if is_paginated(request):
+        total_users = users.count()
+        try:
+            users, next_cursor = keyset_page(users, request, field="date_joined")
+        except ValueError:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        users = list(users.order_by("id"))
+        total_users = len(users)
+
+    user_list = []
     for u in users:
-        # Get all orders for this user
-        user_orders = Order.objects.filter(customer_email=u.email)
-        total_orders = user_orders.count()
-        total_spent = sum(order.total for order in user_orders)
-        address = user_orders.last().shipping_address if user_orders.exists() else "Unknown"
-        phone = user_orders.last().customer_phone if user_orders.exists() else "Unknown"
         user_data = {
             "id": u.id,
             "name": f"{u.first_name} {u.last_name}" if u.first_name or u.last_name else u.username,
             "email": u.email,
-            "phone": phone,
-            "location": address,  # if your model doesn’t have location, set manually
+            "phone": u.latest_phone or "Unknown",
+            "location": u.latest_address or "Unknown",  # if your model doesn’t have location, set manually
             "joinDate": u.date_joined.date().isoformat(),
             "status": "active" if u.is_active else "inactive",
             "role": "customer" if not u.is_staff else "admin",
-            "totalOrders": total_orders,
-            "totalSpent": float(total_spent),
+            "totalOrders": u.total_orders,
+            "totalSpent": float(u.total_spent),
         }
 
         user_list.append(user_data)
 
-    return Response({
-        "total_users": len(user_list),
+    response = {
+        "total_users": total_users,
         "users": user_list
-    })
+    }
+    if is_paginated(request):
+        response["nextCursor"] = next_cursor
+    return Response(response)
 
 
 
@@ -400,14 +547,13 @@ def add_category(request):
         return JsonResponse({"message": "Category already exists"}, status=400)
 
     description = request.POST.get("description", "")
-    product_count = request.POST.get("productCount", 0)
 
     image = request.FILES.get("image")  # Match frontend key: "image"
 
+    # product_count is maintained from product writes (see signals.py)
     category = Category.objects.create(
         name=name,
         description=description,
-        product_count=product_count,
         image=image
     )
 
@@ -416,8 +562,17 @@ def add_category(request):
 @permission_classes([AllowAny])
 def get_categories(request):
     categories = Category.objects.all()
-    serializer = CategorySerializer(categories, many=True, context={'request': request} )
-    return Response(serializer.data)
+    etag, last_modified = catalog.collection_validators(categories, request)
+    not_modified = catalog.not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    def render():
+        serializer = CategorySerializer(categories, many=True, context={'request': request} )
+        return catalog.encode(serializer.data)
+
+    body = catalog.category_listing(request, etag, render)
+    return catalog.with_validators(catalog.json_response(body), etag, last_modified)
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -512,83 +667,214 @@ def get_products(request):
         try:
             store = Store.objects.get(owner=user)
             products = Product.objects.filter(store_id=store.id)
+            scope = f"store:{store.id}"
         except Store.DoesNotExist:
             return JsonResponse({'error': 'Store not found for this user'}, status=404)
     else:
         products = Product.objects.all()
+        scope = "all"
+
+    try:
+        fields = catalog.requested_fields(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    etag, last_modified = catalog.collection_validators(products, request, scope)
+    not_modified = catalog.not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        patch_vary_headers(not_modified, ["Authorization"])
+        return not_modified
+
+    if fields:
+        # sparse payloads are cheap to build, so they skip the snapshot cache
+        products = catalog.sparse_queryset(products, fields, "created_at")
+    else:
+        products = products.only("id", "created_at", "updated_at")
 
+    next_cursor = None
+    if is_paginated(request):
+        try:
+            products, next_cursor = keyset_page(products, request)
+        except ValueError:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
 
-    product_list = []
-    for product in products:
-        product_data = {
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "price": str(product.price),
-            "originalPrice": str(product.original_price) if product.original_price else None,
-            "discount": product.discount,
-            "image": request.build_absolute_uri(product.image.url) if product.image else None,
-            
-            "images": [
-                request.build_absolute_uri(img.image.url)
-                for img in product.images.all()
-            ] if product.images.exists() else [],
-            "category": product.category.name if product.category else None,
-            "brand": product.brand,
-            "rating": product.rating,
-            "reviews": product.reviews,
-            "inStock": product.in_stock,
-            "stockQuantity": product.stock_quantity,
-            "features": product.features if product.features else [],
-            "tags": product.tags if product.tags else [],
-            "isTodaysDeals": product.is_todays_deals,
-            "isBestSeller": product.is_best_seller,
-            "isFeatured": product.is_featured,
-            "isNewArrival": product.is_new_arrival,
-            "isTopRated": product.is_top_rated,
-            "isTrending": product.is_trending,
-            "isFlashSale": product.is_flash_sale,
-            "createdAt": product.created_at.isoformat(),
-            "updatedAt": product.updated_at.isoformat(),
-        }
-        product_list.append(product_data)
-    return JsonResponse(product_list, safe=False)
+    if fields:
+        body = catalog.json_array([catalog.encode(catalog.product_data(p, request, fields)) for p in products])
+    else:
+        products = list(products)
+        snapshots = catalog.get_snapshots(products, request)
+        body = catalog.json_array([snapshots[p.id] for p in products if p.id in snapshots])
+
+    if is_paginated(request):
+        body = b'{"results":' + body + b',"nextCursor":' + catalog.encode(next_cursor) + b'}'
+    response = catalog.json_response(body)
+    patch_vary_headers(response, ["Authorization"])
+    return catalog.with_validators(response, etag, last_modified)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_products(request):
+    """
+    Streams the admin's catalog for exports and product feeds.
+    ?output=ndjson emits one product per line, otherwise a JSON array.
+    """
+    user = request.user
+    if not user.is_superuser:
+        return JsonResponse({"error": "Permission denied"}, status=403)
+
+    try:
+        store = Store.objects.get(owner=user)
+    except Store.DoesNotExist:
+        return JsonResponse({'error': 'Store not found for this user'}, status=404)
+
+    ndjson = request.GET.get("output") == "ndjson"
+    products = Product.objects.filter(store_id=store.id)
+    response = StreamingHttpResponse(
+        catalog.stream_products(products, request, ndjson=ndjson),
+        content_type="application/x-ndjson" if ndjson else "application/json",
+    )
+    filename = "products.ndjson" if ndjson else "products.json"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def filter_products(request):
+    """
+    Merchandising collections, e.g. ?flags=featured,flash_sale&category=&in_stock=&limit=12.
+    Every flag must be set on a product for it to match.
+    """
+    flags = [flag.strip() for flag in request.GET.get("flags", "").split(",") if flag.strip()]
+    unknown = [flag for flag in flags if flag not in MERCHANDISING_FLAGS]
+    if unknown:
+        return JsonResponse({"error": f"Unknown flags: {', '.join(unknown)}"}, status=400)
+
+    products = Product.objects.filter(**{MERCHANDISING_FLAGS[flag]: True for flag in flags})
+
+    category = request.GET.get("category")
+    if category:
+        if category.isdigit():
+            products = products.filter(category_id=int(category))
+        else:
+            products = products.filter(category__name=category)
+
+    in_stock = request.GET.get("in_stock")
+    if in_stock:
+        products = products.filter(in_stock=in_stock.lower() in ["true", "1"])
+
+    try:
+        products, next_cursor = keyset_page(products.only("id", "created_at", "updated_at"), request)
+    except ValueError:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+
+    snapshots = catalog.get_snapshots(products, request)
+    body = catalog.json_array([snapshots[p.id] for p in products if p.id in snapshots])
+    return catalog.json_response(b'{"results":' + body + b',"nextCursor":' + catalog.encode(next_cursor) + b'}')
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def search_products(request):
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "q is required"}, status=400)
+
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        page = 1
+    limit = page_size(request)
+
+    # fetch one extra id to know whether another page follows
+    product_ids = search.search_product_ids(query, (page - 1) * limit, limit + 1)
+    has_more = len(product_ids) > limit
+    product_ids = product_ids[:limit]
+
+    products = Product.objects.only("id", "updated_at").in_bulk(product_ids)
+    snapshots = catalog.get_snapshots(products.values(), request)
+    body = catalog.json_array([snapshots[pk] for pk in product_ids if pk in snapshots])
+    return catalog.json_response(
+        b'{"results":' + body + b',"page":' + catalog.encode(page) + b',"hasMore":' + catalog.encode(has_more) + b'}'
+    )
+
+MAX_BATCH_IDS = 100
+
+
+def request_ids(request, name="ids"):
+    """
+    The integer ids posted as a JSON array or as repeated form fields.
+    Raises ValueError for anything else, including a bare string or number.
+    """
+    if hasattr(request.data, "getlist"):
+        values = request.data.getlist(name)
+    else:
+        values = request.data.get(name, [])
+        if not isinstance(values, list):
+            raise ValueError(f"{name} must be a list")
+    ids = []
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"{name} must be integers")
+        ids.append(int(value))
+    return ids
+
+@api_view(["GET", "POST"])
+@permission_classes([AllowAny])
+def get_products_batch(request):
+    """
+    Hydrates carts, wishlists and order lines in one round trip:
+    GET ?ids=1,2,3 or POST {"ids": [1, 2, 3]}. Results follow the request
+    order, with null for ids that do not exist (also listed in "missing").
+    """
+    try:
+        if request.method == "POST":
+            ids = request_ids(request)
+        else:
+            ids = [int(value) for value in request.GET.get("ids", "").split(",") if value.strip()]
+    except ValueError:
+        return JsonResponse({"error": "ids must be a list of integers"}, status=400)
+    if not ids:
+        return JsonResponse({"error": "ids is required"}, status=400)
+    if len(ids) > MAX_BATCH_IDS:
+        return JsonResponse({"error": f"At most {MAX_BATCH_IDS} ids per request"}, status=400)
+
+    products = Product.objects.only("id", "updated_at").in_bulk(set(ids))
+    snapshots = catalog.get_snapshots(products.values(), request)
+    results = [snapshots.get(pk, b"null") for pk in ids]
+    missing = [pk for pk in ids if pk not in snapshots]
+    return catalog.json_response(
+        b'{"results":' + catalog.json_array(results) + b',"missing":' + catalog.encode(missing) + b'}'
+    )
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_product(request, productId):
     try:
-        product = Product.objects.get(id=productId)
-        product_data = {
-            "id": product.id,
-            "name": product.name,
-            "description": product.description,
-            "price": str(product.price),
-            "originalPrice": str(product.original_price) if product.original_price else None,
-            "discount": product.discount,
-            "image": request.build_absolute_uri(product.image.url) if product.image else None,  
-            "category": product.category.name if product.category else None,
-            "brand": product.brand,
-            "rating": product.rating,
-            "reviews": product.reviews,
-            "inStock": product.in_stock,
-            "stockQuantity": product.stock_quantity,
-            "features": product.features if product.features else [],
-            "tags": product.tags if product.tags else [],
-            "isTodaysDeals": product.is_todays_deals,
-            "isBestSeller": product.is_best_seller,
-            "isFeatured": product.is_featured,
-            "isNewArrival": product.is_new_arrival,
-            "isTopRated": product.is_top_rated,
-            "isTrending": product.is_trending,
-            "isFlashSale": product.is_flash_sale,
-            "createdAt": product.created_at.isoformat(),
-            "updatedAt": product.updated_at.isoformat(),
-        }
-        return JsonResponse(product_data, safe=False)
-    except Product.DoesNotExist:
+        fields = catalog.requested_fields(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    products = Product.objects.filter(id=productId)
+    if fields:
+        product = catalog.sparse_queryset(products, fields, "updated_at").first()
+    else:
+        product = products.only("id", "updated_at").first()
+    if product is None:
         return JsonResponse({"error": "Product not found"}, status=404)
 
+    etag, last_modified = catalog.product_validators(product, request)
+    not_modified = catalog.not_modified(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    if fields:
+        body = catalog.encode(catalog.product_data(product, request, fields))
+        return catalog.with_validators(catalog.json_response(body), etag, last_modified)
+
+    snapshot = catalog.get_snapshot(product, request)
+    if snapshot is None:
+        return JsonResponse({"error": "Product not found"}, status=404)
+    return catalog.with_validators(catalog.json_response(snapshot), etag, last_modified)
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def update_product(request, productId):
@@ -629,22 +915,8 @@ def update_product(request, productId):
 
     product.save()
 
-    product_data = {
-        "id": product.id,
-        "name": product.name,
-        "brand": product.brand,
-        "price": product.price,
-        "originalPrice": product.original_price,
-        "discount": product.discount,
-        "category": product.category.name if product.category else None,
-        "description": product.description,
-        "inStock": product.in_stock,
-        "stockQuantity": product.stock_quantity,
-        "isTodaysDeals": product.is_todays_deals,
-        "image": product.image.url if product.image else None,
-    }
-
-    return JsonResponse({"message": "Product updated successfully", "product": product_data}, status=200)
+    snapshot = catalog.get_snapshot(product, request)
+    return catalog.json_response(b'{"message":"Product updated successfully","product":' + snapshot + b'}')
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def delete_product(request, productId):
@@ -668,22 +940,38 @@ def getOrders(request):
 
     # 🧍 Regular user — show only their own orders
     if not user.is_superuser:
-        orders = Order.objects.filter(customer_email=user.email).prefetch_related("items")
+        orders = (
+            Order.objects.filter(customer=user)
+            .only("id", "order_number", "total", "created_at", "status")
+            .prefetch_related(Prefetch(
+                "items",
+                queryset=OrderItem.objects.only("id", "order_id", "product_id", "product_name", "quantity", "price"),
+            ))
+        )
+
+        next_cursor = None
+        if is_paginated(request):
+            try:
+                orders, next_cursor = keyset_page(orders, request)
+            except ValueError:
+                return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            orders = list(orders)
+
+        # Resolve every product on the page at once for its current image and name
+        product_ids = {item.product_id for order in orders for item in order.items.all()}
+        products = Product.objects.only("id", "name", "image").in_bulk(product_ids)
 
         data = []
         for order in orders:
             items = []
             for item in order.items.all():
-                # Try to fetch product image safely
                 product_image = None
                 product_name = item.product_name
-                try:
-                    product = Product.objects.get(id=item.product_id)
-                    if product.image:
-                        product_image = request.build_absolute_uri(product.image.url)
-                        product_name = product.name  # prefer latest product name
-                except Product.DoesNotExist:
-                    pass
+                product = products.get(item.product_id)
+                if product is not None and product.image:
+                    product_image = request.build_absolute_uri(product.image.url)
+                    product_name = product.name  # prefer latest product name
 
                 items.append({
                     "id": item.id,
@@ -706,6 +994,8 @@ def getOrders(request):
                 "items": items,
             })
 
+        if is_paginated(request):
+            return Response({"results": data, "nextCursor": next_cursor})
         return Response(data)
 
     # 🧑‍💼 Superuser — show all orders summary
@@ -716,11 +1006,23 @@ def getOrders(request):
     except Store.DoesNotExist:
         return Response({"total_orders": 0, "orders": []})
 
-    product_ids = Product.objects.filter(store=store).values_list("id", flat=True)
-    if not product_ids:
-        return Response({"total_orders": 0, "orders": []})
+    orders = (
+        Order.objects.filter(Exists(OrderItem.objects.filter(order=OuterRef("pk"), store=store)))
+        .only("id", "order_number", "customer_name", "customer_email", "created_at", "status", "total")
+        .annotate(item_count=Count("items"))
+    )
+
+    next_cursor = None
+    if is_paginated(request):
+        total_orders = orders.count()
+        try:
+            orders, next_cursor = keyset_page(orders, request)
+        except ValueError:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        orders = list(orders.order_by("-created_at", "-id"))
+        total_orders = len(orders)
 
-    orders = Order.objects.prefetch_related("items").filter(items__product_id__in=product_ids).distinct()
     order_list = []
     for order in orders:
         order_data = {
@@ -731,14 +1033,60 @@ def getOrders(request):
             "date": order.created_at.isoformat(),
             "status": getattr(order, "status", "Pending"),
             "total": float(order.total),
-            "items": order.items.count(),
+            "items": order.item_count,
         }
         order_list.append(order_data)
 
-    return Response({
-        "total_orders": len(order_list),
+    response = {
+        "total_orders": total_orders,
         "orders": order_list
-    })
+    }
+    if is_paginated(request):
+        response["nextCursor"] = next_cursor
+    return Response(response)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_daily_sales(request):
+    """
+    Daily sales for the admin's store from the rollup tables:
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD (default the last 30 days), and
+    ?by=product for one row per product and day.
+    """
+    user = request.user
+    if not user.is_superuser:
+        return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        end = date.fromisoformat(request.GET["to"]) if request.GET.get("to") else date.today()
+        start = date.fromisoformat(request.GET["from"]) if request.GET.get("from") else end - timedelta(days=29)
+    except ValueError:
+        return Response({"error": "Dates must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+    store = Store.objects.filter(owner=user).first()
+    if store is None:
+        return Response({"results": []})
+
+    by_product = request.GET.get("by") == "product"
+    model = ProductDailySales if by_product else StoreDailySales
+    rows = model.objects.filter(store=store, day__gte=start, day__lte=end).order_by("day", "id")
+
+    results = []
+    for row in rows:
+        data = {
+            "day": row.day.isoformat(),
+            "orderCount": row.order_count,
+            "units": row.units,
+            "revenue": str(row.revenue),
+            "statusCounts": {value: getattr(row, field) for value, field in rollups.STATUS_FIELDS.items()},
+        }
+        if by_product:
+            data["productId"] = row.product_id
+        results.append(data)
+    return Response({"results": results})
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def toggle_deal(request, productId):
@@ -879,6 +1227,15 @@ def toggle_wishlist(request):
 
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def token_cache_stats(request):
+    """Hit and eviction counters for this worker's token cache."""
+    if not request.user.is_superuser:
+        return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+    return Response(authentication.token_cache.stats())
+
+
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -888,6 +1245,8 @@ def logout_user(request):
     """
     # Log out the user
     logout(request)
+    if request.auth is not None:
+        authentication.invalidate_tokens([request.auth.key])
 
     # Create a response and delete the sessionid cookie
     response = Response(
@@ -903,14 +1262,16 @@ def logout_user(request):
 @permission_classes([IsAuthenticated])
 def get_cart(request):        
     user = request.user
-    carts = Cart.objects.filter(user=user)
-    count=carts.count()
+    # one query for the rows and their products, one for every product image
+    carts = list(
+        Cart.objects.filter(user=user)
+        .select_related("product")
+        .only("id", "quantity", "product__id", "product__name", "product__price", "product__image")
+        .prefetch_related(Prefetch("product__images", queryset=ProductImage.objects.only("id", "product_id", "image")))
+    )
     serializer = CartSerializer(carts, many=True, context={'request': request})
 
-    print("User:", request.user)
-    print("Is authenticated:", request.user.is_authenticated)
-
-    return Response({"data": serializer.data, "count": count})
+    return Response({"data": serializer.data, "count": len(carts)})
 
 
 